@@ -1,33 +1,64 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
+import time
+import uuid
 import jwt
 from jwt.exceptions import DecodeError, InvalidSignatureError
 from users.models import UserModel
+from users.schemas import UserPrincipalSchema
+from auth.revocation import revoked_tokens
+from auth.user_cache import user_cache
+from core.cache import LRUCache
 from core.database import get_db
 from core.config import settings
 
 # HTTP Bearer scheme (reads Authorization: Bearer <token>)
 security = HTTPBearer(auto_error=False)
 
+# token -> verified claims, each entry expiring with the token's own `exp`
+token_cache = LRUCache(settings.JWT_CACHE_MAX_ENTRIES)
+
+
+# ------------------ TOKEN VERIFICATION ------------------
+def decode_token(token: str) -> dict:
+    """
+    `jwt.decode` (HS256 signature + expiry) memoized per token string.
+
+    Clients resend the same token until it expires, so repeat calls return
+    the cached claims without re-verifying the signature. Entries expire at
+    the token's `exp`; after that the token is decoded (and rejected) again.
+    The returned dict is shared and must not be modified.
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+        if isinstance(claims.get("exp"), (int, float)):
+            token_cache.set(token, claims, expires_at=claims["exp"])
+    return claims
+
 
 # ------------------ AUTHENTICATION DEPENDENCY ------------------
-def get_authenticated_user(
+async def get_authenticated_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-):
+    db: AsyncSession = Depends(get_db),
+) -> UserPrincipalSchema:
     """
     Validates an incoming JWT Access Token from Authorization header.
 
     Steps:
     1. Extract token from the `Authorization` header.
-    2. Decode and verify JWT signature using the secret key.
+    2. Decode and verify JWT signature using the secret key
+       (memoized per token, see `decode_token`).
     3. Check token type and expiration time.
-    4. Fetch and return the user from the database.
+    4. Return the user from the user cache, or fetch it from the database
+       and cache it.
 
     Raises:
     - 401 if token is missing, invalid, expired, or signature is incorrect.
+    - 403 if the user has been deactivated.
     """
     if not credentials or not credentials.credentials:
         raise HTTPException(
@@ -37,7 +68,7 @@ def get_authenticated_user(
 
     token = credentials.credentials
     try:
-        decoded = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+        decoded = decode_token(token)
 
         # Token validation checks
         user_id = decoded.get("user_id")
@@ -45,21 +76,45 @@ def get_authenticated_user(
             raise HTTPException(status_code=401, detail="Invalid token payload")
         if decoded.get("type") != "access":
             raise HTTPException(status_code=401, detail="Invalid token type")
-        if datetime.now(timezone.utc) > datetime.fromtimestamp(decoded.get("exp"), tz=timezone.utc):
+        if time.time() > decoded.get("exp"):
             raise HTTPException(status_code=401, detail="Token expired")
 
-        # Fetch user from DB
-        user = db.query(UserModel).filter_by(id=user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        return user
+        user = await user_cache.get(user_id)
+        if user is None:
+            # Fetch user from DB
+            result = await db.execute(select(UserModel).filter_by(id=user_id))
+            db_user = result.scalars().first()
+            if not db_user:
+                raise HTTPException(status_code=404, detail="User not found")
+            user = UserPrincipalSchema.model_validate(db_user)
+            await user_cache.set(user)
 
     except (InvalidSignatureError, DecodeError):
         raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Authentication failed: {e}")
 
+    # cached principals are dropped when the flag changes, so this is current;
+    # NULL (rows created before the flag had a default) counts as active
+    if user.is_active is False:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")
+    # lets core.database track this user's commits (read-your-writes window)
+    db.info["user_id"] = user.id
+    return user
+
+
+# ------------------ ADMIN DEPENDENCY ------------------
+async def get_admin_user(user: UserPrincipalSchema = Depends(get_authenticated_user)) -> UserPrincipalSchema:
+    """
+    The authenticated user, if their username is listed in `ADMIN_USERNAMES`.
+
+    Raises:
+    - 403 for every other user.
+    """
+    if user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user
+
 
 # ------------------ ACCESS TOKEN GENERATOR ------------------
 def generate_access_token(user_id: int, expires_in: int = 60 * 5) -> str:
@@ -82,11 +137,14 @@ def generate_refresh_token(user_id: int, expires_in: int = 3600 * 24) -> str:
     """
     Generates a long-lived Refresh Token (default: 24 hours).
     - Used to issue a new Access Token without re-login.
+    - Carries a unique `jti`, revoked when the token is used (rotation)
+      or on logout (see auth/revocation.py).
     """
     now = datetime.now(timezone.utc)
     payload = {
         "type": "refresh",
         "user_id": user_id,
+        "jti": uuid.uuid4().hex,
         "iat": now,
         "exp": now + timedelta(seconds=expires_in),
     }
@@ -94,32 +152,38 @@ def generate_refresh_token(user_id: int, expires_in: int = 3600 * 24) -> str:
 
 
 # ------------------ REFRESH TOKEN DECODER ------------------
-def decode_refresh_token(token: str) -> int:
+def decode_refresh_token(token: str) -> dict:
     """
     Decodes and validates a Refresh Token.
 
     Steps:
-    1. Decodes JWT and validates signature.
+    1. Decodes JWT and validates signature (memoized, see `decode_token`).
     2. Checks token type and expiration.
-    3. Returns `user_id` if valid.
+    3. Checks its `jti` against the in-memory revocation index (no query).
+    4. Returns the claims (`user_id`, `jti`, `exp`) if valid.
 
     Raises:
-    - 401 for invalid/expired/malformed tokens.
+    - 401 for invalid/expired/malformed/revoked tokens.
     """
     try:
-        decoded = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+        decoded = decode_token(token)
 
         # Check claims
         if decoded.get("type") != "refresh":
             raise HTTPException(status_code=401, detail="Invalid token type")
-        if datetime.now(timezone.utc) > datetime.fromtimestamp(decoded.get("exp"), tz=timezone.utc):
+        if time.time() > decoded.get("exp"):
             raise HTTPException(status_code=401, detail="Token expired")
 
         user_id = decoded.get("user_id")
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID missing")
+        jti = decoded.get("jti")
+        if not jti:
+            raise HTTPException(status_code=401, detail="Token ID missing")
+        if jti in revoked_tokens:
+            raise HTTPException(status_code=401, detail="Token revoked")
 
-        return user_id
+        return decoded
 
     except (InvalidSignatureError, DecodeError):
         raise HTTPException(status_code=401, detail="Invalid token signature")
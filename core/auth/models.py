@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Index, String
+from core.database import Base
+
+
+class RevokedToken(Base):
+    """
+    A refresh token that must not be used again (rotated or logged out).
+    Rows are only needed until the token expires; see auth/revocation.py.
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        # expired rows are deleted when the index is rebuilt
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    jti = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False)  # the token's `exp`, naive UTC
@@ -0,0 +1,108 @@
+"""
+Revoked refresh tokens, checked in memory.
+
+Refresh tokens carry a `jti` and are rotated on every use: the jti of the
+used token is revoked, so a leaked token works at most once and stops working
+as soon as its owner refreshes or logs out.
+
+- Revocations are stored in `revoked_tokens` until the token expires, and
+  kept in `RevocationIndex`: one set for O(1) lookups, plus the same jtis
+  bucketed by expiry hour so expired ones are dropped a bucket at a time.
+  Checking a token never queries the database.
+- The index is rebuilt from the table at startup (or on first use), which
+  also deletes the rows of expired tokens.
+- Revoking inserts the jti (the primary key), so two concurrent refreshes
+  with the same token, even in different processes, can't both succeed.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.models import RevokedToken
+
+BUCKET_SECONDS = 3600
+
+
+class RevocationIndex:
+    """In-memory set of revoked jtis that forgets them once their token has expired."""
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.loaded = False
+        self._revoked: set[str] = set()
+        # expiry bucket -> jtis of the tokens expiring in it
+        self._buckets: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Revokes `jti` until `expires_at` (epoch seconds)."""
+        with self._lock:
+            self._revoked.add(jti)
+            self._buckets.setdefault(int(expires_at // self.bucket_seconds), set()).add(jti)
+        self.prune()
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Forgets the jtis of buckets whose tokens have all expired."""
+        current = int((time.time() if now is None else now) // self.bucket_seconds)
+        with self._lock:
+            for bucket in [bucket for bucket in self._buckets if bucket < current]:
+                self._revoked.difference_update(self._buckets.pop(bucket))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._buckets.clear()
+
+
+revoked_tokens = RevocationIndex()
+
+
+def _utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+async def load_revoked_tokens(db: AsyncSession) -> None:
+    """Rebuilds `revoked_tokens` from the table, deleting the rows of expired tokens."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    await db.execute(delete(RevokedToken).filter(RevokedToken.expires_at <= now))
+    rows = (await db.execute(
+        select(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now)
+    )).all()
+    await db.commit()
+
+    revoked_tokens.clear()
+    for jti, expires_at in rows:
+        revoked_tokens.add(jti, expires_at.replace(tzinfo=timezone.utc).timestamp())
+    revoked_tokens.loaded = True
+
+
+async def ensure_revoked_tokens_loaded(db: AsyncSession) -> None:
+    """Loads the index on first use when the app was started without its lifespan."""
+    if not revoked_tokens.loaded:
+        await load_revoked_tokens(db)
+
+
+async def revoke_token(db: AsyncSession, jti: str, expires_at: float) -> bool:
+    """
+    Revokes `jti` until `expires_at` (epoch seconds), in the table and in
+    the index. Returns False if it was already revoked (in the table).
+    """
+    db.add(RevokedToken(jti=jti, expires_at=_utc(expires_at)))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        revoked = False
+    else:
+        revoked = True
+    revoked_tokens.add(jti, expires_at)
+    return revoked
@@ -0,0 +1,157 @@
+"""
+Cache of authenticated users for `get_authenticated_user`, so a valid access
+token doesn't cost a user lookup on every request.
+
+- Entries are `UserPrincipalSchema` objects keyed by user id.
+- Backends: in-process TTL + LRU (default) or Redis (`USER_CACHE_BACKEND`).
+- Hits and misses are exported at /metrics as `user_cache_lookups_total`.
+- Entries are dropped after a commit that changes a user's password or
+  `is_active` flag, or deletes the user (see the session events below).
+"""
+import asyncio
+import time
+from typing import Optional, Protocol
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from core.cache import LRUCache
+from core.config import settings
+from core.metrics import user_cache_lookups_total
+from users.models import UserModel
+from users.schemas import UserPrincipalSchema
+
+
+class UserCacheBackend(Protocol):
+    async def get(self, user_id: int) -> Optional[UserPrincipalSchema]: ...
+    async def set(self, user: UserPrincipalSchema) -> None: ...
+    async def delete(self, user_id: int) -> None: ...
+
+
+# ------------------ BACKENDS ------------------
+class InProcessUserCacheBackend:
+    """TTL + LRU cache local to this worker process."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(max_entries)
+
+    async def get(self, user_id: int) -> Optional[UserPrincipalSchema]:
+        return self._entries.get(user_id)
+
+    async def set(self, user: UserPrincipalSchema) -> None:
+        self._entries.set(user.id, user, expires_at=time.time() + self.ttl_seconds)
+
+    async def delete(self, user_id: int) -> None:
+        self._entries.delete(user_id)
+
+
+class RedisUserCacheBackend:
+    """
+    Shared cache on any client with the async redis-py subset
+    `get(key)`, `set(key, value, ex=seconds)` and `delete(key)`.
+    Eviction beyond the TTL is left to the server's maxmemory policy.
+    """
+
+    def __init__(self, client, ttl_seconds: int, prefix: str = "costs:user:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, user_id: int) -> Optional[UserPrincipalSchema]:
+        raw = await self.client.get(f"{self.prefix}{user_id}")
+        return UserPrincipalSchema.model_validate_json(raw) if raw else None
+
+    async def set(self, user: UserPrincipalSchema) -> None:
+        await self.client.set(f"{self.prefix}{user.id}", user.model_dump_json(), ex=self.ttl_seconds)
+
+    async def delete(self, user_id: int) -> None:
+        await self.client.delete(f"{self.prefix}{user_id}")
+
+
+# ------------------ CACHE ------------------
+class UserCache:
+    """Backend wrapper that counts hits and misses; `backend=None` disables caching."""
+
+    def __init__(self, backend: Optional[UserCacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._pending: set[asyncio.Task] = set()
+
+    async def get(self, user_id: int) -> Optional[UserPrincipalSchema]:
+        user = await self.backend.get(user_id) if self.backend else None
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        user_cache_lookups_total.inc(("miss" if user is None else "hit",))
+        return user
+
+    async def set(self, user: UserPrincipalSchema) -> None:
+        if self.backend:
+            await self.backend.set(user)
+
+    async def invalidate(self, user_id: int) -> None:
+        if self.backend:
+            await self.backend.delete(user_id)
+
+    def invalidate_soon(self, user_ids) -> None:
+        """
+        Schedules `invalidate` from sync code (ORM events) on the running loop.
+        Without a loop (CLI commands) entries simply expire after the TTL.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for user_id in user_ids:
+            task = loop.create_task(self.invalidate(user_id))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def build_user_cache() -> UserCache:
+    if settings.USER_CACHE_BACKEND == "none":
+        return UserCache(None)
+    if settings.USER_CACHE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("USER_CACHE_BACKEND=redis requires the `redis` package") from e
+        client = redis.Redis.from_url(settings.USER_CACHE_REDIS_URL)
+        return UserCache(RedisUserCacheBackend(client, settings.USER_CACHE_TTL_SECONDS))
+    return UserCache(
+        InProcessUserCacheBackend(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+    )
+
+
+user_cache = build_user_cache()
+
+
+# ------------------ INVALIDATION ------------------
+_PENDING_KEY = "user_cache_invalidate"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Remembers users whose password / is_active changed or who were deleted."""
+    for obj in session.dirty | session.deleted:
+        if not isinstance(obj, UserModel):
+            continue
+        attrs = inspect(obj).attrs
+        if obj in session.deleted or attrs.password.history.has_changes() or attrs.is_active.history.has_changes():
+            session.info.setdefault(_PENDING_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        user_cache.invalidate_soon(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,68 @@
+"""
+Per-request authentication overhead with and without the verified-token
+and user caches.
+
+Measures `decode_token` alone and the full `get_authenticated_user`
+dependency (token checks + user lookup) for a single repeated token.
+
+Usage (from the `core/` directory):
+    python -m benchmarks.auth_overhead --iterations 20000
+"""
+import argparse
+import asyncio
+from benchmarks.common import Timer, create_tables, use_temp_database
+
+
+async def run(iterations: int) -> None:
+    from fastapi.security import HTTPAuthorizationCredentials
+    from auth import jwt_auth
+    from auth.user_cache import user_cache
+    from core.cache import LRUCache
+    from core.database import open_session
+    from users.models import UserModel
+
+    async with open_session() as db:
+        user = UserModel(username="bench")
+        user.password = "not-a-real-hash"
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    token = jwt_auth.generate_access_token(user_id)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    cached_tokens, cached_backend = jwt_auth.token_cache, user_cache.backend
+
+    def report(label: str, elapsed: float) -> None:
+        print(f"{label:44s} {elapsed / iterations * 1e6:9.1f} us/request")
+
+    for label, caching in (("no caches", False), ("token + user cache", True)):
+        jwt_auth.token_cache = cached_tokens if caching else LRUCache(0)
+        user_cache.backend = cached_backend if caching else None
+        jwt_auth.token_cache.clear()
+
+        with Timer() as decode:
+            for _ in range(iterations):
+                jwt_auth.decode_token(token)
+        report(f"decode_token ({label})", decode.elapsed)
+
+        async with open_session() as db:
+            with Timer() as dependency:
+                for _ in range(iterations):
+                    await jwt_auth.get_authenticated_user(credentials, db)
+        report(f"get_authenticated_user ({label})", dependency.elapsed)
+
+    jwt_auth.token_cache, user_cache.backend = cached_tokens, cached_backend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
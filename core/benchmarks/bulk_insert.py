@@ -0,0 +1,46 @@
+"""
+Rows/sec of POST /costs/bulk against one POST /costs/ per row.
+
+Usage (from the `core/` directory):
+    python -m benchmarks.bulk_insert --rows 5000
+"""
+import argparse
+import asyncio
+from benchmarks.common import Timer, app_client, create_tables, login, use_temp_database
+
+
+async def run(rows: int, chunk: int) -> None:
+    items = [{"description": f"Bench cost {i}", "amount": i % 500 + 0.25} for i in range(rows)]
+
+    async with app_client() as client:
+        headers = await login(client)
+
+        with Timer() as single:
+            for item in items:
+                response = await client.post("/costs/", json=item, headers=headers)
+                response.raise_for_status()
+
+        with Timer() as bulk:
+            for start in range(0, rows, chunk):
+                response = await client.post("/costs/bulk", json=items[start:start + chunk], headers=headers)
+                response.raise_for_status()
+
+    print(f"rows: {rows}")
+    print(f"single-row POST /costs/     {single.elapsed:8.2f}s  {rows / single.elapsed:10.0f} rows/s")
+    print(f"bulk POST /costs/bulk       {bulk.elapsed:8.2f}s  {rows / bulk.elapsed:10.0f} rows/s")
+    print(f"speedup                     {single.elapsed / bulk.elapsed:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="rows inserted by each path")
+    parser.add_argument("--request-size", type=int, default=5000, help="items per bulk request")
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    asyncio.run(run(args.rows, args.request_size))
+
+
+if __name__ == "__main__":
+    main()
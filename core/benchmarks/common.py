@@ -0,0 +1,69 @@
+"""
+Helpers shared by the benchmarks: a throwaway SQLite database and the real
+`app` from main.py driven in-process through httpx's ASGI transport.
+
+Settings are read at import time, so call `use_temp_database()` before
+importing anything from the application.
+"""
+import os
+import statistics
+import tempfile
+import time
+
+
+def use_temp_database() -> str:
+    """Points SQLALCHEMY_DATABASE_URL at a fresh SQLite file (rate limits off) and returns its path."""
+    path = os.path.join(tempfile.mkdtemp(prefix="cost-bench-"), "bench.db")
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{path}"
+    # one in-process client drives each benchmark at full speed
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    return path
+
+
+def create_tables() -> None:
+    from core.database import Base, engine
+    import auth.models  # noqa: F401  (registers the tables on Base)
+    import costs.models  # noqa: F401
+    import jobs.models  # noqa: F401
+    import users.models  # noqa: F401
+
+    Base.metadata.create_all(engine)
+
+
+def app_client():
+    """httpx.AsyncClient bound to the in-process app (no network, no uvicorn)."""
+    import httpx
+    from main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench/api/V1")
+
+
+async def login(client, username: str = "bench", password: str = "bench-password") -> dict:
+    """Registers (if needed) and logs in a user; returns the Authorization header."""
+    await client.post(
+        "/users/register",
+        json={"username": username, "password": password, "password_confirm": password},
+    )
+    response = await client.post("/users/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.cookies['access_token']}"}
+
+
+class Timer:
+    """Context manager measuring wall time in seconds (`elapsed`)."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50 / p95 / p99 of latency samples (seconds), reported in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000, "p99": cuts[98] * 1000}
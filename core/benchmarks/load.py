@@ -0,0 +1,222 @@
+"""
+Throughput and latency of the main cost API operations under concurrent load.
+
+- Seeds `--users` users and `--costs` costs (spread evenly) through the ORM models.
+- Drives the real app in-process, `--concurrency` requests in flight at a time.
+- Reports req/s and p50 / p95 / p99 per operation: register, login, create,
+  list, get, update, delete (delete removes the costs made by `create`).
+- `--output` saves the results as JSON; `--baseline` compares against an
+  earlier file and exits with 1 if any operation regressed by more than
+  `--threshold` (req/s down or p95 up).
+
+Usage (from the `core/` directory):
+    python -m benchmarks.load --users 50 --costs 10000 --concurrency 16 --output before.json
+    python -m benchmarks.load --users 50 --costs 10000 --concurrency 16 --baseline before.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import sys
+import time
+from benchmarks.common import app_client, create_tables, percentiles, use_temp_database
+
+PASSWORD = "bench-password"
+OPERATIONS = ("register", "login", "create", "list", "get", "update", "delete")
+
+
+def seed(users: int, costs: int) -> dict[str, list[int]]:
+    """Inserts the users and costs; returns the cost ids of each username."""
+    from sqlalchemy import select
+    from core.database import SessionLocal
+    from costs.models import Cost
+    from costs.queries import rebuild_rollup
+    from users.models import UserModel
+
+    with SessionLocal() as db:
+        # one bcrypt hash shared by every seeded user keeps seeding fast
+        password = UserModel().hash_password(PASSWORD)
+        db.add_all(UserModel(username=f"seed{i}", password=password) for i in range(users))
+        db.flush()
+        user_ids = db.scalars(select(UserModel.id).order_by(UserModel.id)).all()
+        db.add_all(
+            Cost(description=f"Seed cost {i}", amount=i % 1000 + 0.5, user_id=user_ids[i % users])
+            for i in range(costs)
+        )
+        for stmt in rebuild_rollup():
+            db.execute(stmt)
+        db.commit()
+
+        owned = {f"seed{i}": [] for i in range(users)}
+        for username, cost_id in db.execute(
+            select(UserModel.username, Cost.id).join(Cost.user).order_by(Cost.id)
+        ):
+            owned[username].append(cost_id)
+    return owned
+
+
+async def drive(count: int, concurrency: int, request) -> dict:
+    """
+    Calls `await request(i)` for i in range(count) with at most `concurrency`
+    calls in flight; returns req/s, error count and latency percentiles.
+    """
+    indexes = iter(range(count))
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            response = await request(i)
+            latencies.append(time.perf_counter() - start)
+            errors += response.is_error
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"requests": count, "errors": errors, "seconds": elapsed, "rps": count / elapsed, **percentiles(latencies)}
+
+
+async def run(args) -> dict:
+    owned = seed(args.users, args.costs)
+    usernames = list(owned)
+    results = {}
+
+    async with app_client() as client:
+        async def register(i):
+            return await client.post(
+                "/users/register",
+                json={"username": f"bench{i}", "password": PASSWORD, "password_confirm": PASSWORD},
+            )
+
+        async def login(i):
+            return await client.post("/users/login", json={"username": usernames[i % len(usernames)], "password": PASSWORD})
+
+        results["register"] = await drive(args.auth_requests, args.concurrency, register)
+        results["login"] = await drive(args.auth_requests, args.concurrency, login)
+
+        # one logged-in session per seeded user; request i acts as user i % users
+        headers = []
+        for username in usernames:
+            response = await client.post("/users/login", json={"username": username, "password": PASSWORD})
+            headers.append({"Authorization": f"Bearer {response.cookies['access_token']}"})
+
+        def as_user(i):
+            return i % len(usernames)
+
+        created: list[tuple[int, int]] = []
+
+        async def create(i):
+            response = await client.post(
+                "/costs/", json={"description": f"Load cost {i}", "amount": i % 100 + 0.25}, headers=headers[as_user(i)]
+            )
+            if response.status_code == 201:
+                created.append((as_user(i), response.json()["id"]))
+            return response
+
+        async def list_page(i):
+            return await client.get("/costs/", params={"limit": args.page_size}, headers=headers[as_user(i)])
+
+        def seeded_cost(i):
+            ids = owned[usernames[as_user(i)]]
+            return ids[(i // len(usernames)) % len(ids)]
+
+        async def get(i):
+            return await client.get(f"/costs/{seeded_cost(i)}/", headers=headers[as_user(i)])
+
+        async def update(i):
+            return await client.put(
+                f"/costs/{seeded_cost(i)}/",
+                json={"description": f"Updated cost {i}", "amount": i % 100 + 1},
+                headers=headers[as_user(i)],
+            )
+
+        results["create"] = await drive(args.requests, args.concurrency, create)
+        results["list"] = await drive(args.requests, args.concurrency, list_page)
+        if args.costs >= args.users:
+            results["get"] = await drive(args.requests, args.concurrency, get)
+            results["update"] = await drive(args.requests, args.concurrency, update)
+
+        async def delete(i):
+            user, cost_id = created[i]
+            return await client.delete(f"/costs/{cost_id}/", headers=headers[user])
+
+        results["delete"] = await drive(len(created), args.concurrency, delete)
+
+    return results
+
+
+# ------------------ REPORTING ------------------
+def metadata(args) -> dict:
+    from core.config import settings
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "db_async": settings.DB_ASYNC,
+        **{name: getattr(args, name) for name in ("users", "costs", "concurrency", "requests", "auth_requests", "page_size")},
+    }
+
+
+def print_results(results: dict) -> None:
+    print(f"{'operation':10s} {'requests':>8s} {'errors':>6s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for name in OPERATIONS:
+        if name in results:
+            r = results[name]
+            print(
+                f"{name:10s} {r['requests']:8d} {r['errors']:6d} {r['rps']:9.1f} "
+                f"{r['p50']:8.2f} {r['p95']:8.2f} {r['p99']:8.2f}"
+            )
+
+
+def regressions(baseline: dict, results: dict, threshold: float) -> list[str]:
+    """Operations whose req/s fell, or whose p95 rose, by more than `threshold` (a fraction)."""
+    problems = []
+    for name in OPERATIONS:
+        old, new = baseline.get(name), results.get(name)
+        if not old or not new:
+            continue
+        if new["rps"] < old["rps"] * (1 - threshold):
+            problems.append(f"{name}: req/s {old['rps']:.1f} -> {new['rps']:.1f}")
+        if new["p95"] > old["p95"] * (1 + threshold):
+            problems.append(f"{name}: p95 {old['p95']:.2f}ms -> {new['p95']:.2f}ms")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="seeded users (each gets its own session)")
+    parser.add_argument("--costs", type=int, default=5000, help="seeded costs, spread over the users")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per cost operation")
+    parser.add_argument("--auth-requests", type=int, default=50, help="requests for register and login (bcrypt-bound)")
+    parser.add_argument("--page-size", type=int, default=100, help="`limit` of the list requests")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": metadata(args), "results": results}, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        problems = regressions(baseline, results, args.threshold)
+        for problem in problems:
+            print(f"REGRESSION  {problem}")
+        print(f"{len(problems)} regression(s) against {args.baseline} (threshold {args.threshold:.0%})")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
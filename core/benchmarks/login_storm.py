@@ -0,0 +1,75 @@
+"""
+Latency of GET /costs/{id}/ while concurrent clients hammer POST /users/login.
+
+Run it once per password executor to compare:
+    PASSWORD_HASH_EXECUTOR=inline python -m benchmarks.login_storm
+    PASSWORD_HASH_EXECUTOR=thread python -m benchmarks.login_storm
+
+Usage (from the `core/` directory):
+    python -m benchmarks.login_storm --logins 8 --duration 5
+"""
+import argparse
+import asyncio
+import time
+from benchmarks.common import app_client, create_tables, login, percentiles, use_temp_database
+
+
+async def probe_costs(client, headers: dict, cost_id: int, until: float) -> list[float]:
+    latencies = []
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        response = await client.get(f"/costs/{cost_id}/", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def storm(client, until: float) -> int:
+    logins = 0
+    while time.perf_counter() < until:
+        await client.post("/users/login", json={"username": "bench", "password": "bench-password"})
+        logins += 1
+    return logins
+
+
+async def run(logins: int, duration: float) -> None:
+    from core.config import settings
+
+    async with app_client() as client:
+        headers = await login(client)
+        response = await client.post("/costs/", json={"description": "Probe cost", "amount": 1}, headers=headers)
+        cost_id = response.json()["id"]
+
+        until = time.perf_counter() + duration
+        quiet = await probe_costs(client, headers, cost_id, until)
+
+        until = time.perf_counter() + duration
+        results = await asyncio.gather(
+            probe_costs(client, headers, cost_id, until),
+            *(storm(client, until) for _ in range(logins)),
+        )
+        busy, login_counts = results[0], results[1:]
+
+    print(f"password executor: {settings.PASSWORD_HASH_EXECUTOR}, concurrent login clients: {logins}")
+    for label, samples in (("idle", quiet), ("during login storm", busy)):
+        p = percentiles(samples)
+        print(
+            f"GET /costs/{{id}}/ {label:20s} n={len(samples):6d} "
+            f"p50={p['p50']:8.2f}ms p95={p['p95']:8.2f}ms p99={p['p99']:8.2f}ms"
+        )
+    print(f"logins completed: {sum(login_counts)} ({sum(login_counts) / duration:.1f}/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8, help="concurrent clients calling /users/login")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per phase")
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    asyncio.run(run(args.logins, args.duration))
+
+
+if __name__ == "__main__":
+    main()
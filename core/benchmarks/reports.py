@@ -0,0 +1,80 @@
+"""
+Time to compute the admin spend report (reports/spend.py) over many costs.
+
+- Seeds `--rows` costs over `--users` users in SQL (a recursive CTE, no
+  Python per row), with amounts of a few hundred and about one cost in a
+  thousand a hundred times larger. Incurred dates spread over 2020-2025.
+- Builds the report for a few windows and reports rows, fetch seconds
+  (database -> NumPy) and compute seconds (grouped stats). The FTS triggers
+  are dropped before seeding; the report doesn't read the search index.
+- Repeats the first window through the cache to show the hit latency.
+
+Usage (from the `core/` directory):
+    python -m benchmarks.reports --rows 10000000 --users 10000
+"""
+import argparse
+import asyncio
+import time
+from benchmarks.common import create_tables, use_temp_database
+
+WINDOWS = {
+    "all": {},
+    "2024": {"incurred_from": "2024-01-01T00:00:00", "incurred_to": "2025-01-01T00:00:00"},
+    "2024-06": {"incurred_from": "2024-06-01T00:00:00", "incurred_to": "2024-07-01T00:00:00"},
+}
+
+
+def seed(rows: int, users: int) -> None:
+    from core.database import engine
+    from costs.models import COSTS_FTS_DROP_DDL
+
+    with engine.begin() as conn:
+        for statement in COSTS_FTS_DROP_DDL["sqlite"]:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            "INSERT INTO users (username, password, is_active) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+            "SELECT 'seed' || i, 'unused', 1 FROM n",
+            (users,),
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO costs (description, amount, user_id, incurred_at, created_at) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+            "SELECT 'Seed cost', abs(random()) % 50000 * (CASE WHEN abs(random()) % 1000 = 0 THEN 100 ELSE 1 END), "
+            "abs(random()) % ? + 1, datetime('2020-01-01', '+' || (abs(random()) % 2190) || ' days'), "
+            "CURRENT_TIMESTAMP FROM n",
+            (rows, users),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="seeded costs")
+    parser.add_argument("--users", type=int, default=10_000, help="users the costs are spread over")
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    start = time.perf_counter()
+    seed(args.rows, args.users)
+    print(f"seeded {args.rows} costs in {time.perf_counter() - start:.1f}s")
+
+    from reports.schemas import SpendReportParams
+    from reports.spend import get_spend_report
+
+    print(f"{'window':8s} {'rows':>10s} {'fetch s':>8s} {'compute s':>9s} {'total s':>8s} {'users':>7s}")
+    for name, window in WINDOWS.items():
+        params = SpendReportParams(**window)
+        start = time.perf_counter()
+        report = asyncio.run(get_spend_report(params))
+        elapsed = time.perf_counter() - start
+        t = report.timings
+        print(f"{name:8s} {t.rows:10d} {t.fetch_seconds:8.2f} {t.compute_seconds:9.2f} {elapsed:8.2f} {report.users:7d}")
+
+    start = time.perf_counter()
+    report = asyncio.run(get_spend_report(SpendReportParams(**WINDOWS["all"])))
+    print(f"cached report of window 'all': {(time.perf_counter() - start) * 1000:.2f} ms (cached={report.cached})")
+
+
+if __name__ == "__main__":
+    main()
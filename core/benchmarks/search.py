@@ -0,0 +1,112 @@
+"""
+Latency of description search: the FTS5 index behind GET /costs/search vs a
+LIKE '%term%' scan of the same costs.
+
+- Seeds `--rows` costs (spread over `--users` users) whose descriptions are
+  2-5 words of a 4096-word vocabulary with Zipf-like frequencies; the FTS
+  triggers index them as they are inserted.
+- Runs `--queries` searches of one user's costs per query kind (a word, two
+  words, a word prefix, a rare word) and strategy, one page (`--page-size`)
+  each, and reports p50 / p95 / p99.
+- LIKE stops at the first page of matches in id order, so it is quick for
+  common words and scans the user's whole history for rare ones; FTS looks
+  up matches in the index but ranks all of them (bm25), so its cost follows
+  the number of matching rows.
+
+Usage (from the `core/` directory):
+    python -m benchmarks.search --rows 1000000 --queries 50
+"""
+import argparse
+import random
+import time
+from benchmarks.common import Timer, create_tables, percentiles, use_temp_database
+
+SYLLABLES = "ba ko ri mu te sa lo ne vi du pa zo ki ma ru fe".split()
+# three-syllable pseudo-words, drawn with Zipf-like weights: a few words are
+# in most descriptions, most words in only a handful
+VOCABULARY = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+SEED_CHUNK_SIZE = 10_000
+
+
+def seed(rows: int, users: int) -> None:
+    from sqlalchemy import insert
+    from core.database import SessionLocal
+    from costs.models import Cost
+    from users.models import UserModel
+
+    rng = random.Random(0)
+    with SessionLocal() as db:
+        db.add_all(UserModel(username=f"seed{i}", password="unused") for i in range(users))
+        db.flush()
+        for start in range(0, rows, SEED_CHUNK_SIZE):
+            db.execute(insert(Cost), [
+                {
+                    "description": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(2, 5))).capitalize(),
+                    "amount": i % 1000,
+                    "user_id": i % users + 1,
+                }
+                for i in range(start, min(start + SEED_CHUNK_SIZE, rows))
+            ])
+        db.commit()
+
+
+def search_queries(count: int) -> dict[str, list[str]]:
+    """`count` queries of each kind; common words come up more often, except in "rare word"."""
+    rng = random.Random(1)
+    kinds = {
+        "word": lambda: rng.choices(VOCABULARY, WEIGHTS)[0],
+        "two words": lambda: " ".join(rng.choices(VOCABULARY, WEIGHTS, k=2)),
+        "prefix": lambda: rng.choices(VOCABULARY, WEIGHTS)[0][:4],
+        "rare word": lambda: rng.choice(VOCABULARY[len(VOCABULARY) // 2:]),
+    }
+    return {kind: [make() for _ in range(count)] for kind, make in kinds.items()}
+
+
+def run(args) -> dict:
+    from core.database import SessionLocal
+    from costs import schemas
+    from costs.queries import search_costs
+
+    results = {}
+    with SessionLocal() as db:
+        for kind, queries in search_queries(args.queries).items():
+            # dialect "default" selects the LIKE fallback of search_costs
+            for strategy, dialect_name in (("fts", "sqlite"), ("like", "default")):
+                latencies, matches = [], 0
+                for q in queries:
+                    params = schemas.CostSearchParams(q=q, limit=args.page_size)
+                    stmt = search_costs(dialect_name, 1, params).limit(params.limit)
+                    start = time.perf_counter()
+                    matches += len(db.execute(stmt).scalars().all())
+                    latencies.append(time.perf_counter() - start)
+                    db.expunge_all()
+                results[kind, strategy] = {"queries": len(queries), "rows": matches, **percentiles(latencies)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="seeded costs")
+    parser.add_argument("--users", type=int, default=10, help="users the costs are spread over")
+    parser.add_argument("--queries", type=int, default=50, help="searches of each kind per strategy")
+    parser.add_argument("--page-size", type=int, default=20, help="`limit` of each search")
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    with Timer() as seeding:
+        seed(args.rows, args.users)
+    print(f"seeded {args.rows} costs in {seeding.elapsed:.1f}s")
+
+    results = run(args)
+    print(f"{'query':10s} {'strategy':8s} {'queries':>7s} {'rows':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for (kind, strategy), r in results.items():
+        print(
+            f"{kind:10s} {strategy:8s} {r['queries']:7d} {r['rows']:7d} "
+            f"{r['p50']:8.2f} {r['p95']:8.2f} {r['p99']:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+CPU cost per row of rendering a page of costs as JSON, fetch included.
+
+- `fastapi`: ORM entities validated through `list[CostResponse]`, then
+  `jsonable_encoder` + `json.dumps` (what `response_model` does by default).
+- `typeadapter`: ORM entities validated and dumped in one go by the
+  `list[CostResponse]` TypeAdapter (the regular `GET /costs/` page).
+- `compact`: `(id, description, cents)` tuples encoded with orjson, no ORM
+  and no validation (`GET /costs/?compact=true`).
+
+Usage (from the `core/` directory):
+    python -m benchmarks.serialization --costs 20000 --page-size 1000 --iterations 20
+"""
+import argparse
+import json
+import time
+from benchmarks.common import create_tables, use_temp_database
+
+
+def seed(costs: int) -> None:
+    from sqlalchemy import insert
+    from core.database import SessionLocal
+    from costs.models import Category, Cost
+    from users.models import UserModel
+
+    with SessionLocal() as db:
+        user = UserModel(username="seed", password="unused")
+        db.add(user)
+        db.flush()
+        category = Category(user_id=user.id, name="Food")
+        db.add(category)
+        db.flush()
+        db.execute(insert(Cost), [
+            {
+                "description": f"Seed cost {i}",
+                "amount": i % 1000 + 0.25,
+                "user_id": user.id,
+                "category_id": category.id if i % 2 else None,
+            }
+            for i in range(costs)
+        ])
+        db.commit()
+
+
+def renderers(page_size: int) -> dict:
+    """name -> function(db) returning the JSON body of the first page."""
+    from fastapi.encoders import jsonable_encoder
+    from costs import schemas
+    from costs.compact import encode_compact, select_compact
+    from costs.queries import list_costs, select_costs
+    from costs.routes import COST_LIST
+
+    params = schemas.CostListParams(limit=page_size)
+
+    def entities(db):
+        return db.execute(list_costs(select_costs(), 1, params).limit(page_size)).scalars().all()
+
+    def fastapi(db):
+        return json.dumps(jsonable_encoder(COST_LIST.validate_python(entities(db), from_attributes=True))).encode()
+
+    def typeadapter(db):
+        return COST_LIST.dump_json(COST_LIST.validate_python(entities(db), from_attributes=True))
+
+    def compact(db):
+        return encode_compact(db.execute(list_costs(select_compact(), 1, params).limit(page_size)).all())
+
+    return {"fastapi": fastapi, "typeadapter": typeadapter, "compact": compact}
+
+
+def run(args) -> dict:
+    from core.database import SessionLocal
+
+    results = {}
+    with SessionLocal() as db:
+        for name, render in renderers(args.page_size).items():
+            render(db)  # warm up statement caches
+            db.expunge_all()
+            cpu = 0.0
+            for _ in range(args.iterations):
+                start = time.process_time()
+                body = render(db)
+                cpu += time.process_time() - start
+                # a new request gets a new session: don't let the identity map carry over
+                db.expunge_all()
+            rows = args.iterations * args.page_size
+            results[name] = {"rows": rows, "bytes": len(body), "us_per_row": cpu / rows * 1e6}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--costs", type=int, default=20_000, help="seeded costs (one user)")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows per rendered page (at most --costs)")
+    parser.add_argument("--iterations", type=int, default=20, help="pages rendered per path")
+    args = parser.parse_args()
+
+    use_temp_database()
+    create_tables()
+    seed(args.costs)
+    results = run(args)
+
+    baseline = results["fastapi"]["us_per_row"]
+    print(f"{'path':12s} {'rows':>7s} {'page bytes':>10s} {'CPU us/row':>10s} {'speedup':>8s}")
+    for name, r in results.items():
+        print(f"{name:12s} {r['rows']:7d} {r['bytes']:10d} {r['us_per_row']:10.2f} {baseline / r['us_per_row']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
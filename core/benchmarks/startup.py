@@ -0,0 +1,152 @@
+"""
+Cold start: time from launching a fresh interpreter to the first response.
+
+- Each run starts a new Python process that imports `main`, runs the app's
+  lifespan (as a server would) and sends one authenticated `GET /costs/`
+  through the ASGI transport; it reports when each phase finished.
+- Phases: interpreter start (until the child's first line of code), import
+  of `main`, lifespan startup, first request; `total` is spawn -> response
+  (minus the child's import of httpx, which only the benchmark needs).
+- `--profile-imports` instead prints per-module import times of `main`
+  (from `python -X importtime`): the slowest modules by self time and the
+  total per top-level package. For a real worker, set
+  `PYTHONPROFILEIMPORTTIME=1` to get the raw data on stderr.
+
+Usage (from the `core/` directory):
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --profile-imports --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from benchmarks.common import create_tables, percentiles, use_temp_database
+
+PHASES = ("interpreter", "import", "lifespan", "first_request", "total")
+
+# runs in the child: print the wall-clock time at which each phase ended
+CHILD = """
+import time
+started = time.time()
+import asyncio, json, sys
+import httpx  # the client, not part of the app's startup
+
+client_imported = time.time()
+import main
+
+imported = time.time()
+
+async def first_response():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.time()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup/api/V1") as client:
+            response = await client.get("/costs/", headers={"Authorization": "Bearer " + sys.argv[1]})
+            response.raise_for_status()
+            responded = time.time()
+    return ready, responded
+
+ready, responded = asyncio.run(first_response())
+print(json.dumps({
+    "started": started, "client_imported": client_imported, "imported": imported, "ready": ready, "responded": responded,
+}))
+"""
+
+
+def seed() -> str:
+    """One user with a cost; returns an access token of that user."""
+    from auth.jwt_auth import generate_access_token
+    from core.database import SessionLocal
+    from costs.models import Cost
+    from users.models import UserModel
+
+    with SessionLocal() as db:
+        user = UserModel(username="seed", password="unused")
+        db.add(user)
+        db.flush()
+        db.add(Cost(description="Seed cost", amount=1, user_id=user.id))
+        db.commit()
+        return generate_access_token(user.id, expires_in=3600)
+
+
+def run_once(token: str) -> dict:
+    """Seconds spent in each phase of one cold start."""
+    spawned = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, token], capture_output=True, text=True, check=True, env=os.environ.copy()
+    )
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        "interpreter": marks["started"] - spawned,
+        "import": marks["imported"] - marks["client_imported"],
+        "lifespan": marks["ready"] - marks["imported"],
+        "first_request": marks["responded"] - marks["ready"],
+        # without the benchmark's own httpx import
+        "total": marks["responded"] - spawned - (marks["client_imported"] - marks["started"]),
+    }
+
+
+def import_times() -> list[tuple[str, int, int]]:
+    """(module, self us, cumulative us) of every module imported by `import main`, in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, check=True, env=os.environ.copy(),
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    # keep the subtree of `main`: the entries after the previous top-level import
+    end = max(i for i, (name, _, _) in enumerate(entries) if name.strip() == "main")
+    start = end
+    while start > 0 and entries[start - 1][0].startswith("  "):
+        start -= 1
+    return [(name.strip(), self_us, cumulative_us) for name, self_us, cumulative_us in entries[start:end + 1]]
+
+
+def profile_imports(top: int) -> None:
+    entries = import_times()
+    total_ms = entries[-1][2] / 1000
+    print(f"import main: {total_ms:.1f} ms, {len(entries)} modules\n")
+
+    print(f"{'module':40s} {'self ms':>8s} {'cumul ms':>9s}")
+    for name, self_us, cumulative_us in sorted(entries, key=lambda entry: -entry[1])[:top]:
+        print(f"{name:40s} {self_us / 1000:8.1f} {cumulative_us / 1000:9.1f}")
+
+    packages = defaultdict(int)
+    for name, self_us, _ in entries:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'package':40s} {'self ms':>8s} {'share':>6s}")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:40s} {self_us / 1000:8.1f} {self_us / 1000 / total_ms:6.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="cold starts measured")
+    parser.add_argument("--profile-imports", action="store_true", help="print per-module import times instead")
+    parser.add_argument("--top", type=int, default=25, help="rows of the import profile")
+    args = parser.parse_args()
+
+    use_temp_database()
+    if args.profile_imports:
+        profile_imports(args.top)
+        return
+
+    create_tables()
+    token = seed()
+    runs = [run_once(token) for _ in range(args.runs)]
+    print(f"{'phase':14s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s}")
+    for phase in PHASES:
+        samples = [run[phase] for run in runs]
+        p = percentiles(samples)
+        print(f"{phase:14s} {p['p50']:8.1f} {p['p95']:8.1f} {max(samples) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,115 @@
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+
+class RateLimit(BaseModel):
+    """Token bucket of one route: `burst` requests at once, refilled at `rate` per second."""
+    rate: float = Field(gt=0)
+    burst: int = Field(ge=1)
+
 class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URL: str  # اصلاح املای ALCHAMY → ALCHEMY
     JWT_SECRET_KEY: str = "test"
+    # verified-token cache in auth/jwt_auth.py (0 disables it)
+    JWT_CACHE_MAX_ENTRIES: int = 10_000
+
+    # database access mode: True -> AsyncSession on an async driver, False -> blocking Session
+    DB_ASYNC: bool = True
+    # optional explicit async URL, derived from SQLALCHEMY_DATABASE_URL when not set
+    SQLALCHEMY_ASYNC_DATABASE_URL: Optional[str] = None
+    # read replicas as a JSON list of sync URLs; read-only routes use them round-robin
+    SQLALCHEMY_REPLICA_URLS: list[str] = []
+    # after a user's commit, their reads stay on the primary for this many seconds
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # connection pool (core/pool.py); sizing is ignored for in-memory SQLite
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SLOW_CHECKOUT_SECONDS: float = 0.1  # log checkouts that wait longer
+    # extra DBAPI connect() arguments as JSON, e.g. {"sslmode": "require"}
+    DB_CONNECT_ARGS: dict[str, Any] = {}
+    # applied to every SQLite connection
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+
+    # cache of authenticated users (auth/user_cache.py): "memory", "redis" or "none"
+    USER_CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10_000
+    USER_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # bcrypt off the event loop (users/passwords.py): "thread", "process" or "inline"
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process", "inline"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    # hash/verify calls admitted at once (running + queued in the pool)
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 16
+    PASSWORD_HASH_ADMISSION_TIMEOUT: float = 5.0
+
+    # serialized cost list / summary responses kept per (user, data version, query), 0 disables
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+
+    # log requests slower than this (seconds) with the SQL they ran (core/metrics.py); unset disables
+    SLOW_REQUEST_SECONDS: Optional[float] = None
+
+    # token-bucket rate limits (core/ratelimit.py) per client: the user of a valid
+    # access token, else the client IP (login: username + IP).
+    # JSON, "METHOD route" -> {"rate", "burst"}
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, RateLimit] = {
+        "POST /api/V1/users/login": RateLimit(rate=0.2, burst=10),
+        "POST /api/V1/users/register": RateLimit(rate=0.05, burst=5),
+        "GET /api/V1/costs/": RateLimit(rate=20, burst=50),
+    }
+    # buckets kept in memory, least recently used dropped beyond this
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # reverse proxies (addresses or networks) whose X-Forwarded-For names the
+    # client IP; empty: the peer address is the client
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = []
+    # shed requests with 503 + Retry-After while primary pool checkouts wait
+    # longer than this many seconds (recent average); unset disables
+    DB_ADMISSION_MAX_WAIT_SECONDS: Optional[float] = 1.0
+
+    # admin reports (reports/): usernames allowed in, JSON list, e.g. ["alice"]
+    ADMIN_USERNAMES: list[str] = []
+    # a computed report is served again for this many seconds per window
+    ADMIN_REPORT_CACHE_SECONDS: float = 300
+    # (id, user_id, amount) rows fetched per round-trip into the NumPy arrays
+    ADMIN_REPORT_CHUNK_SIZE: int = 100_000
+
+    # background jobs (jobs/): asyncio workers (and threads) per process, and
+    # processes for CPU-bound kinds (0: those run in the threads too)
+    JOB_WORKERS: int = 2
+    JOB_PROCESS_WORKERS: int = 0
+    # uploads and results of jobs (jobs/storage.py), default <tmp>/cost-jobs;
+    # must be shared storage when several hosts serve the API
+    JOB_STORAGE_DIR: Optional[str] = None
+    # largest import upload accepted by POST /jobs/import (413 beyond)
+    JOB_UPLOAD_MAX_BYTES: int = 100 * 1024 * 1024
+
     model_config = SettingsConfigDict(env_file=".env")  # اصلاح mosel_config → model_config
 
+    @property
+    def async_database_url(self) -> str:
+        """Async driver URL, e.g. sqlite:///x.db -> sqlite+aiosqlite:///x.db"""
+        if self.SQLALCHEMY_ASYNC_DATABASE_URL:
+            return self.SQLALCHEMY_ASYNC_DATABASE_URL
+        return to_async_url(self.SQLALCHEMY_DATABASE_URL)
+
+
+def to_async_url(url: str) -> str:
+    """Swaps a sync driver prefix for its async counterpart (unknown URLs are returned as-is)."""
+    for sync_prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
 settings = Settings()
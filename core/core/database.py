@@ -1,21 +1,228 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker,declarative_base
-from core.config import settings
+"""
+Engines, sessions and the declarative Base.
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False # only for sqlite
-}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Engines (and their pools) are created on first use, not at import, so a
+worker process doesn't pay for them before it has a request that needs the
+database: the lifespan's first query, `SessionLocal()`, `open_session()`,
+or reading `engine` / `async_engine` / `replicas` from this module.
+"""
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker,declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from core.cache import LRUCache
+from core.config import settings, to_async_url
+from core.pool import PoolStats, apply_sqlite_pragmas, engine_options, is_sqlite, pool_status
+
+
+def _create_engines(url: str, async_url: str):
+    """Sync + async engine pair for one database, each with its own pool stats."""
+    stats, async_stats = PoolStats(), PoolStats()
+    sync_engine = create_engine(url, **engine_options(url, QueuePool, stats))
+    async_engine = create_async_engine(async_url, **engine_options(async_url, AsyncAdaptedQueuePool, async_stats))
+    if is_sqlite(url):
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return sync_engine, async_engine, stats, async_stats
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker creating the engines before its first session."""
+
+    def __call__(self, **local_kw):
+        init_engines()
+        return super().__call__(**local_kw)
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    """async_sessionmaker creating the engines before its first session."""
+
+    def __call__(self, **local_kw):
+        init_engines()
+        return super().__call__(**local_kw)
+
+
+# bound to the primary engines by init_engines()
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+# expire_on_commit=False: attributes can't be lazily reloaded on an AsyncSession
+AsyncSessionLocal = _LazyAsyncSessionmaker(autoflush=False, expire_on_commit=False)
+
+_ENGINE_NAMES = ("engine", "async_engine", "engine_stats", "async_engine_stats", "replicas")
+_engines_lock = threading.Lock()
+_engines_ready = False
+
+
+def init_engines() -> None:
+    """
+    Creates the primary engines and the read replicas (once per process) and
+    binds the session factories to them.
+    """
+    global engine, async_engine, engine_stats, async_engine_stats, replicas, _next_replica, _engines_ready
+    if _engines_ready:
+        return
+    with _engines_lock:
+        if _engines_ready:
+            return
+        engine, async_engine, engine_stats, async_engine_stats = _create_engines(
+            settings.SQLALCHEMY_DATABASE_URL, settings.async_database_url
+        )
+        # (sync engine, async engine, stats, async stats) per read replica
+        replicas = [_create_engines(url, to_async_url(url)) for url in settings.SQLALCHEMY_REPLICA_URLS]
+        _next_replica = itertools.cycle(range(len(replicas)))
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        _engines_ready = True
+
+
+def __getattr__(name: str):
+    # `from core.database import engine` and friends create the engines on demand
+    if name in _ENGINE_NAMES:
+        init_engines()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# users who committed recently, expiring after READ_YOUR_WRITES_SECONDS
+recent_writers = LRUCache(100_000)
 
 
 # create base class for declaring tables
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+class SyncSessionAdapter:
+    """
+    Exposes a blocking `Session` through the awaitable subset of the
+    `AsyncSession` API used by the routers.
+
+    Used when `DB_ASYNC` is disabled so the same handlers run on the old
+    sync path (queries still block the event loop, which is the point of
+    keeping it around for benchmarks).
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return self.sync_session.execute(statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return self.sync_session.scalar(statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return self.sync_session.scalars(statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        result = self.sync_session.execute(statement, params, **kwargs)
+
+        async def rows():
+            for row in result:
+                yield row
+
+        return rows()
+
+    async def get(self, entity, ident, **kwargs):
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def delete(self, instance) -> None:
+        self.sync_session.delete(instance)
+
+    async def flush(self) -> None:
+        self.sync_session.flush()
+
+    async def commit(self) -> None:
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        self.sync_session.refresh(instance, attribute_names)
+
+    async def close(self) -> None:
+        self.sync_session.close()
+
+
+@asynccontextmanager
+async def open_session(replica: bool = False):
+    """
+    Opens a database session outside of request dependencies
+    (e.g. inside a StreamingResponse body that outlives the handler).
+    - DB_ASYNC=True (default): a native AsyncSession on the async engine.
+    - DB_ASYNC=False: the blocking Session wrapped in SyncSessionAdapter.
+    - replica=True: bound to the next read replica (round-robin), or to the
+      primary when no replicas are configured. Only for reads.
+    """
+    init_engines()
+    bind, async_bind = engine, async_engine
+    if replica and replicas:
+        bind, async_bind, _, _ = replicas[next(_next_replica)]
+
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal(bind=async_bind) as db:
+            yield db
+    else:
+        db = SyncSessionAdapter(SessionLocal(bind=bind))
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+async def get_db():
+    """Yields a primary database session for the request (see `open_session`)."""
+    async with open_session() as db:
         yield db
-    finally:
-        db.close()
+
+
+# ------------------ READ-YOUR-WRITES ------------------
+def wrote_recently(user_id: int) -> bool:
+    """True while the user is inside the read-your-writes window of their last commit."""
+    return recent_writers.get(user_id) is not None
+
+
+@event.listens_for(Session, "after_commit")
+def _track_user_writes(session):
+    # primary sessions are tagged with the user by get_authenticated_user;
+    # only mutating routes commit, so a commit means the user just wrote
+    user_id = session.info.get("user_id")
+    if user_id is not None and settings.READ_YOUR_WRITES_SECONDS > 0:
+        recent_writers.set(user_id, True, expires_at=time.time() + settings.READ_YOUR_WRITES_SECONDS)
+
+
+def pool_pressure() -> float:
+    """Recent checkout wait (seconds) of the busier primary pool, see `PoolStats.pressure`."""
+    if not _engines_ready:
+        return 0.0
+    return max(engine_stats.pressure(), async_engine_stats.pressure())
+
+
+def get_pool_status() -> dict:
+    """Pool size, checked-out connections and checkout wait times per engine."""
+    init_engines()
+    status = {
+        "sync": pool_status(engine, engine_stats),
+        "async": pool_status(async_engine, async_engine_stats),
+    }
+    for index, (sync_engine, replica_async_engine, stats, async_stats) in enumerate(replicas):
+        status[f"replica_{index}_sync"] = pool_status(sync_engine, stats)
+        status[f"replica_{index}_async"] = pool_status(replica_async_engine, async_stats)
+    return status
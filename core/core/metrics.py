@@ -0,0 +1,205 @@
+"""
+Request-level instrumentation, exposed in Prometheus text format at /metrics.
+
+- `MetricsMiddleware` times every request and labels it with the route
+  template (e.g. `/api/V1/costs/{id}/`), method and status.
+- SQLAlchemy cursor events (on every engine) count the queries a request
+  runs and the time spent in them, to spot N+1 patterns per route.
+- `user_cache_lookups_total` counts hits and misses of the user cache.
+- With `SLOW_REQUEST_SECONDS` set, requests slower than that are logged
+  together with the SQL statements they ran.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+# statements kept per request for the slow-request log
+SLOW_LOG_MAX_STATEMENTS = 50
+
+
+class Histogram:
+    """Cumulative-bucket histogram of one label set."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    """A named histogram or counter with one series per label set."""
+
+    def __init__(self, name: str, help: str, kind: str, labels: tuple[str, ...], buckets: tuple = ()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labels = labels
+        self.buckets = buckets
+        self.series: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self._lock:
+            histogram = self.series.get(label_values)
+            if histogram is None:
+                histogram = self.series[label_values] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, label_values: tuple, value: float = 1) -> None:
+        with self._lock:
+            self.series[label_values] = self.series.get(label_values, 0) + value
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self.series.items())
+        for values, metric in sorted(series):
+            if self.kind == "counter":
+                lines.append(f"{self.name}{self._labels(values)} {metric}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), metric.counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._labels(values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {metric.sum}")
+            lines.append(f"{self.name}_count{self._labels(values)} {metric.count}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ------------------ REGISTRY ------------------
+ROUTE_LABELS = ("method", "route")
+
+request_duration = MetricFamily(
+    "http_request_duration_seconds", "Time to serve a request, including a streamed body.",
+    "histogram", (*ROUTE_LABELS, "status"), LATENCY_BUCKETS,
+)
+request_queries = MetricFamily(
+    "http_request_db_queries", "SQL statements executed per request.",
+    "histogram", ROUTE_LABELS, QUERY_COUNT_BUCKETS,
+)
+request_db_seconds = MetricFamily(
+    "http_request_db_seconds", "Time spent executing SQL per request.",
+    "histogram", ROUTE_LABELS, LATENCY_BUCKETS,
+)
+db_queries_total = MetricFamily(
+    "db_queries_total", "SQL statements executed, inside or outside requests.", "counter", ("inside_request",),
+)
+user_cache_lookups_total = MetricFamily(
+    "user_cache_lookups_total", "Authenticated-user cache lookups (auth/user_cache.py).", "counter", ("result",),
+)
+
+METRICS = [request_duration, request_queries, request_db_seconds, db_queries_total, user_cache_lookups_total]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for family in METRICS for line in family.render()) + "\n"
+
+
+# ------------------ SQL COUNTERS ------------------
+class RequestSQLStats:
+    """SQL statements run while serving one request."""
+
+    def __init__(self, keep_statements: bool):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Optional[list[tuple[float, str]]] = [] if keep_statements else None
+
+
+current_request: contextvars.ContextVar[Optional[RequestSQLStats]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+# The start time lives on the statement's execution context, which is
+# discarded with the statement: one that raises leaves nothing behind on the
+# connection (and is not counted).
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    stats = current_request.get()
+    db_queries_total.inc(("true" if stats else "false",))
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.seconds += elapsed
+    if stats.statements is not None and len(stats.statements) < SLOW_LOG_MAX_STATEMENTS:
+        stats.statements.append((elapsed, statement))
+
+
+# ------------------ MIDDLEWARE ------------------
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request until its last body chunk is sent.
+    Requests that match no route are labelled `route="unmatched"`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestSQLStats(keep_statements=settings.SLOW_REQUEST_SECONDS is not None)
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path_format", "unmatched"))
+            request_duration.observe((*labels, status_code), elapsed)
+            request_queries.observe(labels, stats.queries)
+            request_db_seconds.observe(labels, stats.seconds)
+            if settings.SLOW_REQUEST_SECONDS is not None and elapsed >= settings.SLOW_REQUEST_SECONDS:
+                _log_slow_request(scope, status_code, elapsed, stats)
+
+
+def _log_slow_request(scope, status_code: int, elapsed: float, stats: RequestSQLStats) -> None:
+    statements = "".join(f"\n  {seconds * 1000:8.1f} ms  {sql}" for seconds, sql in stats.statements)
+    logger.warning(
+        "slow request: %s %s -> %s in %.1f ms, %d queries (%.1f ms)%s",
+        scope["method"], scope["path"], status_code, elapsed * 1000, stats.queries, stats.seconds * 1000, statements,
+    )
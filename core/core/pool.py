@@ -0,0 +1,140 @@
+"""
+Engine / connection-pool configuration for core/database.py.
+
+- Pool sizing, pre-ping, recycle, timeout and connect args come from Settings.
+- SQLite connections get journal_mode / synchronous / mmap_size pragmas.
+- Queue pools are wrapped to record how long checkouts wait for a connection.
+"""
+import logging
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# weight of the latest checkout in PoolStats.recent_wait
+RECENT_WAIT_WEIGHT = 0.2
+# recent_wait is ignored once no checkout completed for this long
+RECENT_WAIT_WINDOW_SECONDS = 1.0
+
+
+class PoolStats:
+    """Checkout counters of one engine's pool (exposed at /system/db-pool)."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # moving average of the latest checkout waits, for load shedding
+        self.recent_wait = 0.0
+        self.last_checkout = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.recent_wait += (wait - self.recent_wait) * RECENT_WAIT_WEIGHT
+            self.last_checkout = time.monotonic()
+
+    def pressure(self) -> float:
+        """
+        Recent checkout wait in seconds, or 0 when no checkout completed in
+        the last RECENT_WAIT_WINDOW_SECONDS (so shedding stops by itself and
+        the next checkouts measure the pool again).
+        """
+        if time.monotonic() - self.last_checkout > RECENT_WAIT_WINDOW_SECONDS:
+            return 0.0
+        return self.recent_wait
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "recent_wait_ms": self.pressure() * 1000,
+        }
+
+
+class _TimedPoolMixin:
+    """
+    Times `_do_get` (waiting for a free connection, or opening a new one)
+    and logs slow checkouts.
+    """
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.stats.record(wait, timed_out)
+            if wait >= settings.DB_POOL_SLOW_CHECKOUT_SECONDS:
+                logger.warning("slow connection checkout: waited %.1f ms (%s)", wait * 1000, self.status())
+
+
+def timed_pool(pool_class, stats: PoolStats):
+    """Subclass of `pool_class` recording into `stats` (kept across pool.recreate())."""
+    return type(f"Timed{pool_class.__name__}", (_TimedPoolMixin, pool_class), {"stats": stats})
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in database
+
+
+def engine_options(url: str, pool_class, stats: PoolStats) -> dict:
+    """
+    create_engine / create_async_engine keyword arguments for `url`.
+    In-memory SQLite keeps SQLAlchemy's single-connection pool (a queue pool
+    would give every connection its own empty database).
+    """
+    connect_args = dict(settings.DB_CONNECT_ARGS)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "connect_args": connect_args}
+    if is_sqlite(url):
+        connect_args.setdefault("check_same_thread", False)
+        if _is_sqlite_memory(url):
+            return options
+
+    options.update(
+        poolclass=timed_pool(pool_class, stats),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """`connect` event: per-connection SQLite tuning."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def pool_status(engine, stats: PoolStats) -> dict:
+    pool = engine.pool
+    status = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        status.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return {**status, **stats.as_dict()}
@@ -0,0 +1,187 @@
+"""
+Per-client rate limiting and load shedding.
+
+- `rate_limit` (an app-wide dependency) takes a token from the client's
+  bucket for the matched route, if `RATE_LIMITS` lists it, and rejects with
+  429 + Retry-After when the bucket is empty. It runs before the route's own
+  dependencies, so a rejected request costs no connection and no bcrypt.
+- Clients are the user of a valid access token (read from the memoized JWT
+  claims, no query) or, without one, the client IP. Login attempts are
+  counted per username and IP, so clients behind one NAT don't share a
+  bucket and a username can't be locked out from elsewhere.
+- The client IP is the peer address, unless that is one of
+  RATE_LIMIT_TRUSTED_PROXIES: then it is the last X-Forwarded-For entry not
+  added by a trusted proxy. (Alternatively, run uvicorn with
+  `--proxy-headers --forwarded-allow-ips=<proxy>`, which rewrites the peer.)
+- Buckets live in memory, least recently used first: updates are O(1), and
+  idle buckets are evicted from the front as they refill (a full bucket is
+  the same as a new one), or beyond RATE_LIMIT_MAX_KEYS.
+- `LoadSheddingMiddleware` answers 503 + Retry-After while connection
+  checkouts on the primary pool recently waited longer than
+  DB_ADMISSION_MAX_WAIT_SECONDS, instead of queueing more requests on it.
+"""
+import ipaddress
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from jwt.exceptions import PyJWTError
+from auth.jwt_auth import decode_token
+from core.config import settings
+from core.database import pool_pressure
+
+# still served while shedding, to watch the overload
+SHED_EXEMPT_PATHS = ("/metrics", "/api/V1/system/")
+# routes limited per (username of the JSON body, client IP)
+USERNAME_KEYED_ROUTES = ("POST /api/V1/users/login",)
+
+TRUSTED_PROXIES = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES]
+
+
+# ------------------ TOKEN BUCKETS ------------------
+class TokenBucketLimiter:
+    """Token buckets by key, in least recently used order."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, full_at] (monotonic seconds)
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: Hashable, rate: float, burst: int, now: Optional[float] = None) -> float:
+        """
+        Takes a token from `key`'s bucket (a new bucket starts full).
+        Returns 0 when one was available, else the seconds until there is one.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(burst)
+            else:
+                tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+            self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+
+limiter = TokenBucketLimiter(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def _trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str:
+    """
+    The peer address, or behind RATE_LIMIT_TRUSTED_PROXIES the rightmost
+    X-Forwarded-For entry that isn't a trusted proxy (entries left of it
+    are set by the client and can be forged).
+    """
+    address = request.client.host if request.client else "unknown"
+    if not _trusted(address):
+        return address
+    forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",") if entry.strip()]
+    for entry in reversed(forwarded):
+        address = entry
+        if not _trusted(entry):
+            break
+    return address
+
+
+async def login_key(request: Request) -> str:
+    """`login:<username>|ip:<address>`, the username read from the (already received) JSON body."""
+    try:
+        username = json.loads(await request.body()).get("username")
+    except (ValueError, AttributeError):
+        username = None
+    # lower-cased like the login route does; a malformed body is validated there
+    username = username.lower() if isinstance(username, str) else ""
+    return f"login:{username}|ip:{client_ip(request)}"
+
+
+def client_key(request: Request) -> str:
+    """`user:<id>` for a valid access token, else `ip:<address>`."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            claims = decode_token(token)
+        except PyJWTError:
+            claims = {}
+        if claims.get("type") == "access" and claims.get("user_id"):
+            return f"user:{claims['user_id']}"
+    return f"ip:{client_ip(request)}"
+
+
+# ------------------ RATE LIMIT DEPENDENCY ------------------
+async def rate_limit(request: Request) -> None:
+    """
+    Applies the `RATE_LIMITS` entry of the matched route ("METHOD route
+    template", e.g. "GET /api/V1/costs/"), per client (per username and IP
+    for USERNAME_KEYED_ROUTES).
+
+    Raises:
+    - 429 with Retry-After (seconds) when the client's bucket is empty.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    route = f"{request.method} {request.scope['route'].path_format}"
+    limit = settings.RATE_LIMITS.get(route)
+    if limit is None:
+        return
+    key = await login_key(request) if route in USERNAME_KEYED_ROUTES else client_key(request)
+    wait = limiter.acquire((route, key), limit.rate, limit.burst)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, try again shortly",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+# ------------------ LOAD SHEDDING ------------------
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware rejecting requests with 503 while the primary pool is
+    saturated (see `PoolStats.pressure`), except for SHED_EXEMPT_PATHS.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        threshold = settings.DB_ADMISSION_MAX_WAIT_SECONDS
+        if scope["type"] == "http" and threshold is not None and not scope["path"].startswith(SHED_EXEMPT_PATHS):
+            wait = pool_pressure()
+            if wait > threshold:
+                response = JSONResponse(
+                    {"detail": "Server busy, try again shortly"},
+                    status_code=503,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
@@ -0,0 +1,22 @@
+from fastapi import Depends
+from auth.jwt_auth import get_authenticated_user
+from core.database import open_session, wrote_recently
+from users.schemas import UserPrincipalSchema
+
+
+# ------------------ READ ROUTING DEPENDENCY ------------------
+async def get_read_db(user: UserPrincipalSchema = Depends(get_authenticated_user)):
+    """
+    `get_db` variant for read-only routes.
+    - Yields a session on the next read replica (round-robin).
+    - Within READ_YOUR_WRITES_SECONDS of the user's last commit, or when no
+      replicas are configured, yields a primary session instead.
+
+    The write window is tracked per worker process.
+    """
+    async with open_session(replica=use_replica(user.id)) as db:
+        yield db
+
+
+def use_replica(user_id: int) -> bool:
+    return not wrote_recently(user_id)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from auth.jwt_auth import get_admin_user
+from core.database import get_pool_status
+from core.metrics import render_metrics
+
+router = APIRouter(prefix="/system", tags=["system"])
+# mounted without the API prefix, where Prometheus expects it
+metrics_router = APIRouter(tags=["system"])
+
+
+# ------------------ DB POOL ------------------
+@router.get("/db-pool", dependencies=[Depends(get_admin_user)])
+async def db_pool_status():
+    """
+    Admins: connection pool state of the sync and async engines:
+    - size / checked_out / overflow of the queue pool
+    - checkouts, timeouts and average / max time spent waiting for a connection
+    """
+    return get_pool_status()
+
+
+# ------------------ METRICS ------------------
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text exposition of the request metrics (core/metrics.py):
+    - latency histogram per route, method and status
+    - SQL statements and SQL time per request, per route
+    - user cache hits and misses
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,212 @@
+"""
+Maintenance commands for the costs tables.
+
+Usage (from the `core/` directory):
+    python -m costs.commands check-query-plans
+    python -m costs.commands rebuild-rollup [--check]
+    python -m costs.commands archive --before 2025-01-01 [--batch-size 1000]
+"""
+import argparse
+import datetime
+import sys
+from collections import defaultdict
+from sqlalchemy import create_engine, delete, insert, select
+from core.database import Base, SessionLocal
+from costs import models, schemas
+from costs.compact import select_compact
+from costs.queries import (
+    category_totals, cost_data_version, cost_histogram, cost_summary, delete_cost_tags, labels_by_name, list_costs,
+    owned_cost, period_totals, rebuild_rollup, rollup_delta, rollup_from_costs, rollup_summary, search_costs,
+    select_costs, select_export, top_costs,
+)
+from users.models import UserModel
+
+
+# ------------------ QUERY PLAN CHECK ------------------
+def router_queries() -> dict:
+    """Representative statements issued by the costs and users routers."""
+    user_id = 1
+    page = schemas.CostListParams(cursor=10)
+    filtered = schemas.CostListParams(min_amount=1, max_amount=10, description_prefix="Lunch")
+    labelled = schemas.CostListParams(category="Food", tags=["work", "travel"])
+    this_month = schemas.CostPeriodParams(period="day", incurred_from="2026-10-01", incurred_to="2026-11-01")
+    return {
+        "costs: list page": list_costs(select_costs(), user_id, schemas.CostListParams()).limit(101),
+        "costs: list page (compact)": list_costs(select_compact(), user_id, schemas.CostListParams()).limit(101),
+        "costs: list next page": list_costs(select_costs(), user_id, page).limit(101),
+        "costs: list filtered": list_costs(select_costs(), user_id, filtered).limit(101),
+        "costs: list by category and tags": list_costs(select_costs(), user_id, labelled).limit(101),
+        "costs: tags of a page (selectinload)": select(models.Tag).join(
+            models.cost_tags, models.cost_tags.c.tag_id == models.Tag.id
+        ).filter(models.cost_tags.c.cost_id.in_([1, 2, 3])),
+        "costs: stream / export": list_costs(select_export(), user_id, filtered),
+        "costs: summary": cost_summary(user_id, filtered),
+        "costs: histogram": cost_histogram(user_id, schemas.CostHistogramParams()),
+        "costs: period totals": period_totals("sqlite", user_id, this_month),
+        "costs: category totals": category_totals(user_id, schemas.CostFilterParams()),
+        "costs: resolve tag names": labels_by_name(models.Tag, user_id, ["work", "travel"]),
+        "costs: detach tags": delete_cost_tags([1, 2, 3]),
+        "costs: top": top_costs(user_id, schemas.CostTopParams()),
+        "costs: search (FTS5)": search_costs("sqlite", user_id, schemas.CostSearchParams(q="lunch pay")).limit(21),
+        "costs: rollup summary": rollup_summary(user_id),
+        "costs: data version (ETag)": cost_data_version(user_id),
+        "costs: get/update/delete": owned_cost(5, user_id),
+        "users: authenticate": select(UserModel).filter_by(id=user_id),
+        "users: register/login": select(UserModel).filter_by(username="bob"),
+    }
+
+
+def full_scans(conn, stmt) -> list[str]:
+    """Runs EXPLAIN QUERY PLAN and returns the steps that scan a whole table."""
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    # some constructs (e.g. aggregate_strings' separator) stay bound parameters
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    # rows are (id, parent, notused, detail); "SCAN <table>" means no index seek,
+    # except for "SCAN <fts table> VIRTUAL TABLE INDEX ...", which is an FTS index lookup
+    return [row[3] for row in plan if row[3].startswith("SCAN ") and "VIRTUAL TABLE INDEX" not in row[3]]
+
+
+def query_plan_scans() -> dict[str, list[str]]:
+    """
+    Builds the schema from the models in an in-memory SQLite database and
+    returns the full table scans of each router query (empty: index only).
+    Also run by the test suite (tests/test_query_plans.py).
+    """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        return {name: full_scans(conn, stmt) for name, stmt in router_queries().items()}
+
+
+def check_query_plans(args) -> int:
+    """Fails if any router query falls back to a full table scan."""
+    failures = 0
+    for name, scans in query_plan_scans().items():
+        if scans:
+            failures += 1
+            print(f"FAIL  {name}: {'; '.join(scans)}")
+        else:
+            print(f"ok    {name}")
+    return 1 if failures else 0
+
+
+# ------------------ ROLLUP REPAIR ------------------
+def rollup_drift(db) -> list[str]:
+    """Compares `user_cost_totals` against fresh aggregates over `costs`."""
+    expected = {row.user_id: row for row in db.execute(rollup_from_costs())}
+    stored = {row.user_id: row for row in db.scalars(select(models.UserCostTotal))}
+    problems = []
+    for user_id in sorted(expected.keys() | stored.keys()):
+        want, have = expected.get(user_id), stored.get(user_id)
+        want_count, want_total = (want.cost_count, want.amount_total) if want else (0, 0)
+        have_count, have_total = (have.cost_count, have.amount_total) if have else (0, 0)
+        if want_count != have_count or want_total != have_total:
+            problems.append(
+                f"user {user_id}: rollup has count={have_count} total={have_total}, "
+                f"costs have count={want_count} total={want_total}"
+            )
+    return problems
+
+
+def rebuild_rollup_command(args) -> int:
+    """
+    Reports drift between `user_cost_totals` and `costs`, then rebuilds
+    the rollup in one transaction (or only reports with --check).
+    """
+    with SessionLocal() as db:
+        problems = rollup_drift(db)
+        for problem in problems:
+            print(f"drift  {problem}")
+        if args.check:
+            print(f"{len(problems)} user(s) with drift")
+            return 1 if problems else 0
+
+        for stmt in rebuild_rollup():
+            db.execute(stmt)
+        db.commit()
+        print(f"rollup rebuilt ({len(problems)} user(s) had drift)")
+    return 0
+
+
+# ------------------ ARCHIVAL ------------------
+ARCHIVE_COLUMNS = ["id", "description", "amount", "incurred_at", "created_at", "category_id", "user_id"]
+
+
+def archive_costs(db, before: datetime.datetime, batch_size: int) -> int:
+    """
+    Moves costs incurred before `before` into `costs_archive`, one transaction
+    per batch of `batch_size` rows, and takes them out of the rollup.
+    Walks `costs` once in id order, so no index on `incurred_at` alone is needed.
+    Returns the number of rows moved.
+    """
+    dialect_name = db.bind.dialect.name
+    moved, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(models.Cost.id, models.Cost.user_id, models.Cost.amount)
+            .filter(models.Cost.id > last_id, models.Cost.incurred_at < before)
+            .order_by(models.Cost.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return moved
+
+        ids = [row.id for row in rows]
+        columns = [getattr(models.Cost, name) for name in ARCHIVE_COLUMNS]
+        db.execute(
+            insert(models.CostArchive).from_select(
+                ARCHIVE_COLUMNS, select(*columns).filter(models.Cost.id.in_(ids))
+            )
+        )
+        # tags are not archived
+        db.execute(delete_cost_tags(ids))
+        db.execute(delete(models.Cost).filter(models.Cost.id.in_(ids)))
+
+        per_user = defaultdict(lambda: [0, 0])
+        for row in rows:
+            if row.user_id is not None:
+                per_user[row.user_id][0] += 1
+                per_user[row.user_id][1] += row.amount
+        for user_id, (count, total) in per_user.items():
+            db.execute(rollup_delta(dialect_name, user_id, -count, -total))
+        db.commit()
+
+        moved += len(rows)
+        last_id = ids[-1]
+        print(f"archived {moved} cost(s) (up to id {last_id})")
+
+
+def archive_command(args) -> int:
+    with SessionLocal() as db:
+        moved = archive_costs(db, args.before, args.batch_size)
+    print(f"{moved} cost(s) incurred before {args.before.isoformat()} moved to costs_archive")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m costs.commands", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "check-query-plans", help="fail if a router query does a full table scan"
+    ).set_defaults(handler=check_query_plans)
+
+    rollup = commands.add_parser("rebuild-rollup", help="rebuild user_cost_totals from costs")
+    rollup.add_argument("--check", action="store_true", help="only report drift, exit 1 if any")
+    rollup.set_defaults(handler=rebuild_rollup_command)
+
+    archive = commands.add_parser("archive", help="move old costs into costs_archive")
+    archive.add_argument(
+        "--before", type=datetime.datetime.fromisoformat, required=True,
+        help="archive costs incurred before this UTC date/time, e.g. 2025-01-01",
+    )
+    archive.add_argument("--batch-size", type=int, default=1000, help="rows moved per transaction")
+    archive.set_defaults(handler=archive_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
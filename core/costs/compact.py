@@ -0,0 +1,33 @@
+"""
+Compact cost listings (`GET /costs/?compact=true`).
+
+Large pages spend most of their CPU time turning rows into ORM objects and
+validating them again through `CostResponse`. The compact path selects
+plain `(id, description, cents)` tuples, skips the identity map and
+Pydantic (the rows come straight from our own table), and encodes them
+with orjson.
+"""
+from typing import Sequence
+import orjson
+from sqlalchemy import BigInteger, select, type_coerce
+from costs import models
+from costs.money import format_minor_units
+
+# amounts are read as raw cents and formatted directly (see `encode_compact`)
+COMPACT_COLUMNS = (
+    models.Cost.id,
+    models.Cost.description,
+    type_coerce(models.Cost.amount, BigInteger).label("amount"),
+)
+
+
+def select_compact():
+    return select(*COMPACT_COLUMNS)
+
+
+def encode_compact(rows: Sequence) -> bytes:
+    """JSON array of {id, description, amount} objects, amounts as decimal strings like CostResponse."""
+    return orjson.dumps([
+        {"id": id, "description": description, "amount": format_minor_units(cents)}
+        for id, description, cents in rows
+    ])
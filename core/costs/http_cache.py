@@ -0,0 +1,66 @@
+"""
+Conditional GETs and a response cache for the read-only cost endpoints.
+
+- Every cost mutation bumps the user's `user_cost_totals.version` in the same
+  transaction (see `rollup_delta`), so (user, version, path, query) names
+  one exact response body.
+- `If-None-Match` hits are answered with 304 after reading only the version.
+- Serialized bodies are kept in a bounded LRU keyed the same way; old
+  versions are never read again and simply fall out of it.
+"""
+import hashlib
+from typing import Awaitable, Callable, Optional
+from fastapi import Request, Response
+from core.cache import LRUCache
+from core.config import settings
+from costs.queries import cost_data_version
+
+# (JSON body, extra headers) of a response that can be served again
+CachedBody = tuple[bytes, dict[str, str]]
+
+response_cache = LRUCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def etag(user_id: int, version: int, request: Request) -> str:
+    """Strong ETag of the response to `request` at the given data version."""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    key = f"{user_id}:{version}:{request.url.path}?{query}".encode()
+    return '"' + hashlib.blake2b(key, digest_size=16).hexdigest() + '"'
+
+
+def matches(if_none_match: Optional[str], tag: str) -> bool:
+    """`If-None-Match` comparison (weak, as RFC 9110 requires for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return tag in candidates
+
+
+async def cached_response(
+    request: Request,
+    db,
+    user_id: int,
+    produce: Callable[[], Awaitable[CachedBody]],
+    cache: bool = True,
+) -> Response:
+    """
+    Answers a read of the user's costs:
+    - 304 when `If-None-Match` matches the current version,
+    - the cached body when this version was already serialized (`cache=True`),
+    - otherwise `produce()` -> (JSON body, extra headers), cached for next time.
+    """
+    version = await db.scalar(cost_data_version(user_id)) or 0
+    tag = etag(user_id, version, request)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+
+    entry = response_cache.get(tag) if cache else None
+    if entry is None:
+        entry = await produce()
+        if cache:
+            response_cache.set(tag, entry)
+    body, extra_headers = entry
+    return Response(body, media_type="application/json", headers={**headers, **extra_headers})
@@ -0,0 +1,51 @@
+"""
+Categories and tags of costs: names in the API, ids in the database.
+
+Names are resolved in bulk (one SELECT, plus one INSERT when some are new)
+and tags are attached with one executemany INSERT into `cost_tags`, so a
+request or bulk chunk costs the same number of statements whatever its size.
+"""
+from itertools import chain
+from typing import Iterable, Optional
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from costs import models
+from costs.queries import delete_cost_tags, insert_labels, labels_by_name
+
+
+async def resolve_labels(db: AsyncSession, model, user_id: int, names: Iterable[str]) -> dict[str, int]:
+    """Ids of the user's categories or tags by name, creating the missing ones."""
+    names = set(names)
+    if not names:
+        return {}
+    ids = dict((await db.execute(labels_by_name(model, user_id, names))).all())
+    missing = names - ids.keys()
+    if missing:
+        await db.execute(insert_labels(db.bind.dialect.name, model, user_id, sorted(missing)))
+        ids.update((await db.execute(labels_by_name(model, user_id, missing))).all())
+    return ids
+
+
+async def category_id(db: AsyncSession, user_id: int, name: Optional[str]) -> Optional[int]:
+    if name is None:
+        return None
+    return (await resolve_labels(db, models.Category, user_id, [name]))[name]
+
+
+async def set_cost_tags(db: AsyncSession, user_id: int, tags_by_cost: dict[int, list[str]], replace: bool = True) -> None:
+    """
+    Attaches the named tags to each cost id; with `replace` the costs' current
+    tags are removed first. The caller commits.
+    """
+    if not tags_by_cost:
+        return
+    if replace:
+        await db.execute(delete_cost_tags(list(tags_by_cost)))
+    tag_ids = await resolve_labels(db, models.Tag, user_id, chain.from_iterable(tags_by_cost.values()))
+    rows = [
+        {"cost_id": cost_id, "tag_id": tag_ids[name]}
+        for cost_id, names in tags_by_cost.items()
+        for name in set(names)
+    ]
+    if rows:
+        await db.execute(insert(models.cost_tags), rows)
@@ -1,13 +1,133 @@
-from sqlalchemy import Column, Integer, String,Float ,ForeignKey
+from sqlalchemy import DDL, Column, DateTime, Integer, String ,ForeignKey, Index, Table, UniqueConstraint, event
+from sqlalchemy.sql import func
+from costs.money import Money
 from core.database import Base
 from sqlalchemy.orm import relationship
 
+# many-to-many costs <-> tags; the primary key serves "tags of a cost", the index "costs with a tag"
+cost_tags = Table(
+    "cost_tags",
+    Base.metadata,
+    Column("cost_id", Integer, ForeignKey("costs.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_cost_tags_tag_id_cost_id", "tag_id", "cost_id"),
+)
+
+
+class Category(Base):
+    """A user's spending category; each cost has at most one."""
+    __tablename__ = "categories"
+    __table_args__ = (UniqueConstraint("user_id", "name", name="uq_categories_user_id_name"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    name = Column(String(50), nullable=False)
+
+
+class Tag(Base):
+    """A user's free-form label; a cost can have many."""
+    __tablename__ = "tags"
+    __table_args__ = (UniqueConstraint("user_id", "name", name="uq_tags_user_id_name"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    name = Column(String(50), nullable=False)
+
+
 class Cost(Base):
     __tablename__ = "costs"
+    __table_args__ = (
+        # every router query filters on user_id; (user_id, id) also serves keyset pages
+        Index("ix_costs_user_id_id", "user_id", "id"),
+        # min/max/top-N per user without reading all of the user's rows
+        Index("ix_costs_user_id_amount", "user_id", "amount"),
+        # date-range filters and per-period totals
+        Index("ix_costs_user_id_incurred_at", "user_id", "incurred_at"),
+        # category filters and per-category totals
+        Index("ix_costs_user_id_category_id", "user_id", "category_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)  # integer cents in the database, Decimal in Python
+    # naive UTC timestamps
+    incurred_at = Column(DateTime, nullable=False, server_default=func.now())
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    user = relationship("UserModel", back_populates="costs")
\ No newline at end of file
+    # relationships never lazy-load: queries ask for them explicitly (costs.queries.select_costs),
+    # so an N+1 fails loudly instead of issuing one query per row
+    user = relationship("UserModel", back_populates="costs", lazy="raise_on_sql")
+    category = relationship("Category", lazy="raise_on_sql")
+    tags = relationship("Tag", secondary=cost_tags, lazy="raise_on_sql", passive_deletes=True, order_by="Tag.name")
+
+
+# ------------------ FULL-TEXT SEARCH ------------------
+# SQLite: external-content FTS5 table over costs.description, kept in sync by triggers.
+# PostgreSQL: GIN expression index on to_tsvector('simple', description), maintained by the index itself.
+# Also created by the migration; listed here so create_all() builds the same schema.
+COSTS_FTS_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE costs_fts USING fts5(description, content='costs', content_rowid='id')",
+        "CREATE TRIGGER costs_fts_insert AFTER INSERT ON costs BEGIN "
+        "INSERT INTO costs_fts(rowid, description) VALUES (new.id, new.description); END",
+        "CREATE TRIGGER costs_fts_delete AFTER DELETE ON costs BEGIN "
+        "INSERT INTO costs_fts(costs_fts, rowid, description) VALUES ('delete', old.id, old.description); END",
+        "CREATE TRIGGER costs_fts_update AFTER UPDATE OF description ON costs BEGIN "
+        "INSERT INTO costs_fts(costs_fts, rowid, description) VALUES ('delete', old.id, old.description); "
+        "INSERT INTO costs_fts(rowid, description) VALUES (new.id, new.description); END",
+    ],
+    "postgresql": [
+        "CREATE INDEX ix_costs_description_fts ON costs USING GIN (to_tsvector('simple', description))",
+    ],
+}
+COSTS_FTS_DROP_DDL = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS costs_fts_update",
+        "DROP TRIGGER IF EXISTS costs_fts_delete",
+        "DROP TRIGGER IF EXISTS costs_fts_insert",
+        "DROP TABLE IF EXISTS costs_fts",
+    ],
+    "postgresql": ["DROP INDEX IF EXISTS ix_costs_description_fts"],
+}
+for _dialect, _statements in COSTS_FTS_DDL.items():
+    for _statement in _statements:
+        event.listen(Cost.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+for _dialect, _statements in COSTS_FTS_DROP_DDL.items():
+    for _statement in _statements:
+        event.listen(Cost.__table__, "before_drop", DDL(_statement).execute_if(dialect=_dialect))
+
+
+class CostArchive(Base):
+    """
+    Costs moved out of `costs` by `python -m costs.commands archive`
+    (no longer listed or counted in the rollup).
+    """
+    __tablename__ = "costs_archive"
+    __table_args__ = (
+        Index("ix_costs_archive_user_id_incurred_at", "user_id", "incurred_at"),
+    )
+
+    id = Column(Integer, primary_key=True)  # id the cost had in `costs`
+    description = Column(String, nullable=False)
+    amount = Column(Money, nullable=False)
+    incurred_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class UserCostTotal(Base):
+    """
+    Per-user rollup of `costs`, kept in sync by the cost routes in the same
+    transaction as the change. Rebuild with `python -m costs.commands rebuild-rollup`.
+    """
+    __tablename__ = "user_cost_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    cost_count = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Money, nullable=False, default=0)
+    # bumped by every cost mutation; ETag / response-cache key of the user's cost reads
+    version = Column(Integer, nullable=False, default=0, server_default="0")
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Exact money amounts.
+
+Amounts are `Decimal`s with at most MONEY_DECIMAL_PLACES places in Python and
+integer minor units (cents) in the database, so SQL SUM/MIN/MAX are exact
+integer arithmetic and `ix_costs_user_id_amount` orders integers.
+"""
+from decimal import Decimal
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+MONEY_DECIMAL_PLACES = 2
+MINOR_UNITS = 10 ** MONEY_DECIMAL_PLACES
+
+
+def to_minor_units(value) -> int:
+    """Decimal('12.34') -> 1234. Raises ValueError for sub-cent precision."""
+    scaled = Decimal(str(value)).scaleb(MONEY_DECIMAL_PLACES)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{value} has more than {MONEY_DECIMAL_PLACES} decimal places")
+    return int(scaled)
+
+
+def from_minor_units(value: int) -> Decimal:
+    """1234 -> Decimal('12.34')"""
+    return Decimal(value).scaleb(-MONEY_DECIMAL_PLACES)
+
+
+def format_minor_units(value: int) -> str:
+    """1234 -> '12.34', the JSON form of amounts, without building a Decimal."""
+    units, minor = divmod(abs(value), MINOR_UNITS)
+    return f"{'-' if value < 0 else ''}{units}.{minor:0{MONEY_DECIMAL_PLACES}d}"
+
+
+class Money(TypeDecorator):
+    """`Decimal` amount stored as a BIGINT number of minor units."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_minor_units(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_minor_units(value)
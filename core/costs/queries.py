@@ -0,0 +1,328 @@
+import re
+from decimal import Decimal
+from sqlalchemy import (
+    BigInteger, Date, and_, cast, column, delete, func, insert, literal, literal_column, select, table, type_coerce,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload, selectinload
+from costs import models, schemas
+from costs.money import to_minor_units
+
+# dialect-specific INSERT constructs that support ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+# between the tag names aggregated by `select_export` (not valid in a name anyone types)
+TAG_SEPARATOR = "\x1f"
+
+
+def select_costs():
+    """
+    SELECT of Cost entities with their category (joined) and tags (one
+    extra IN query per result set) loaded up front.
+    """
+    return select(models.Cost).options(joinedload(models.Cost.category), selectinload(models.Cost.tags))
+
+
+def select_export():
+    """
+    SELECT of flat export rows: id, description, amount, incurred_at, the
+    category name and the tag names joined by TAG_SEPARATOR (both correlated
+    lookups by primary key, so rows still stream from one cursor).
+    """
+    category = select(models.Category.name).filter(
+        models.Category.id == models.Cost.category_id
+    ).scalar_subquery()
+    tags = select(func.aggregate_strings(models.Tag.name, TAG_SEPARATOR)).select_from(models.cost_tags).join(
+        models.Tag, models.Tag.id == models.cost_tags.c.tag_id
+    ).filter(models.cost_tags.c.cost_id == models.Cost.id).scalar_subquery()
+    return select(
+        models.Cost.id, models.Cost.description, models.Cost.amount, models.Cost.incurred_at,
+        category.label("category"), tags.label("tags"),
+    )
+
+
+def owned_cost(id: int, user_id: int):
+    """SELECT for one cost, only if it belongs to the given user."""
+    return select_costs().filter(
+        models.Cost.id == id,
+        models.Cost.user_id == user_id
+    )
+
+
+def filter_costs(stmt, user_id: int, params: schemas.CostFilterParams):
+    """Restricts a costs query to one user and applies the amount/description/date/label filters."""
+    stmt = stmt.filter(models.Cost.user_id == user_id)
+    if params.min_amount is not None:
+        stmt = stmt.filter(models.Cost.amount >= params.min_amount)
+    if params.max_amount is not None:
+        stmt = stmt.filter(models.Cost.amount <= params.max_amount)
+    if params.description_prefix:
+        stmt = stmt.filter(models.Cost.description.startswith(params.description_prefix, autoescape=True))
+    if params.incurred_from is not None:
+        stmt = stmt.filter(models.Cost.incurred_at >= params.incurred_from)
+    if params.incurred_to is not None:
+        stmt = stmt.filter(models.Cost.incurred_at < params.incurred_to)
+    if params.category is not None:
+        stmt = stmt.filter(models.Cost.category_id == select(models.Category.id).filter(
+            models.Category.user_id == user_id, models.Category.name == params.category
+        ).scalar_subquery())
+    if params.tags:
+        tags = set(params.tags)
+        tagged = select(models.cost_tags.c.cost_id).join(
+            models.Tag, models.Tag.id == models.cost_tags.c.tag_id
+        ).filter(
+            models.Tag.user_id == user_id, models.Tag.name.in_(tags)
+        ).group_by(models.cost_tags.c.cost_id).having(func.count() == len(tags))
+        stmt = stmt.filter(models.Cost.id.in_(tagged))
+    return stmt
+
+
+def list_costs(stmt, user_id: int, params: schemas.CostListParams):
+    """Filtered costs after the keyset cursor, ordered by id (the caller applies the limit)."""
+    stmt = filter_costs(stmt, user_id, params)
+    if params.cursor is not None:
+        stmt = stmt.filter(models.Cost.id > params.cursor)
+    return stmt.order_by(models.Cost.id)
+
+
+def cost_summary(user_id: int, params: schemas.CostFilterParams):
+    """count / total / min / max of the user's costs in a single row (see `mean`)."""
+    amount = models.Cost.amount
+    return filter_costs(
+        select(
+            func.count(models.Cost.id).label("count"),
+            func.coalesce(func.sum(amount), 0).label("total"),
+            func.min(amount).label("min"),
+            func.max(amount).label("max"),
+        ),
+        user_id,
+        params,
+    )
+
+
+def mean(total: Decimal, count: int):
+    """Exact mean rounded to cents, None without costs."""
+    return (total / count).quantize(Decimal(1).scaleb(-2)) if count else None
+
+
+def cost_histogram(user_id: int, params: schemas.CostHistogramParams):
+    """
+    Per-bucket count and total, bucket = floor(amount / bucket_size) (amounts are never negative),
+    computed by integer division of the stored cents.
+    """
+    cents = type_coerce(models.Cost.amount, BigInteger)
+    bucket = (cents // to_minor_units(params.bucket_size)).label("bucket")
+    return filter_costs(
+        select(
+            bucket,
+            func.count(models.Cost.id).label("count"),
+            func.sum(models.Cost.amount).label("total"),
+        ),
+        user_id,
+        params,
+    ).group_by(bucket).order_by(bucket)
+
+
+def period_start(dialect_name: str, period: str):
+    """First day of the day / week (Monday) / month containing `incurred_at`."""
+    incurred_at = models.Cost.incurred_at
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(period, incurred_at), Date)
+    if period == "day":
+        return func.date(incurred_at)
+    if period == "week":
+        # next Sunday (or the same day), then back to its Monday
+        return func.date(incurred_at, "weekday 0", "-6 days")
+    return func.date(incurred_at, "start of month")
+
+
+def period_totals(dialect_name: str, user_id: int, params: schemas.CostPeriodParams):
+    """Count and total of the user's costs per day / week / month, oldest first."""
+    start = period_start(dialect_name, params.period).label("start")
+    return filter_costs(
+        select(
+            start,
+            func.count(models.Cost.id).label("count"),
+            func.sum(models.Cost.amount).label("total"),
+        ),
+        user_id,
+        params,
+    ).group_by(start).order_by(start)
+
+
+def top_costs(user_id: int, params: schemas.CostTopParams):
+    """The user's n largest costs."""
+    return filter_costs(select_costs(), user_id, params).order_by(
+        models.Cost.amount.desc(), models.Cost.id
+    ).limit(params.n)
+
+
+def category_totals(user_id: int, params: schemas.CostFilterParams):
+    """Count and total per category (null: uncategorized) in one GROUP BY, largest total first."""
+    total = func.coalesce(func.sum(models.Cost.amount), 0).label("total")
+    return filter_costs(
+        select(
+            models.Category.name.label("category"),
+            func.count(models.Cost.id).label("count"),
+            total,
+        ).select_from(models.Cost).outerjoin(models.Category, models.Cost.category_id == models.Category.id),
+        user_id,
+        params,
+    ).group_by(models.Cost.category_id, models.Category.name).order_by(total.desc())
+
+
+# ------------------ SEARCH ------------------
+# external-content FTS5 table of costs.description (SQLite, see models.COSTS_FTS_DDL)
+costs_fts = table("costs_fts", column("rowid"), column("description"), column("rank"))
+# text search configuration of the PostgreSQL GIN index; must match its expression
+_TS_CONFIG = literal_column("'simple'")
+
+
+def search_terms(q: str) -> list[str]:
+    """Words of a search query (descriptions only contain letters, digits and spaces)."""
+    return re.findall(r"[a-zA-Z0-9]+", q)
+
+
+def like_search(terms: list[str]):
+    """Unindexed fallback: every term is a substring of the description (case-insensitive)."""
+    return and_(*(models.Cost.description.icontains(term, autoescape=True) for term in terms))
+
+
+def search_costs(dialect_name: str, user_id: int, params: schemas.CostSearchParams):
+    """
+    The user's costs whose description contains every word of `params.q`
+    (the last one as a prefix, for search-as-you-type), best match first.
+    - SQLite: FTS5 MATCH ordered by bm25 `rank`.
+    - PostgreSQL: `@@` on the GIN-indexed tsvector ordered by `ts_rank`.
+    - Other dialects: LIKE scan ordered by id.
+    The caller applies limit/offset.
+    """
+    terms = search_terms(params.q)
+    stmt = filter_costs(select_costs(), user_id, params)
+    if dialect_name == "sqlite":
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        return stmt.join(costs_fts, costs_fts.c.rowid == models.Cost.id).filter(
+            costs_fts.c.description.match(match)
+        ).order_by(costs_fts.c.rank, models.Cost.id)
+    if dialect_name == "postgresql":
+        vector = func.to_tsvector(_TS_CONFIG, models.Cost.description)
+        query = func.to_tsquery(_TS_CONFIG, " & ".join(terms) + ":*")
+        return stmt.filter(vector.op("@@")(query)).order_by(func.ts_rank(vector, query).desc(), models.Cost.id)
+    return stmt.filter(like_search(terms)).order_by(models.Cost.id)
+
+
+# ------------------ LABELS ------------------
+def labels_by_name(model, user_id: int, names):
+    """(name, id) of the user's categories or tags with the given names."""
+    return select(model.name, model.id).filter(model.user_id == user_id, model.name.in_(names))
+
+
+def insert_labels(dialect_name: str, model, user_id: int, names):
+    """Creates the user's categories or tags that don't exist yet (concurrent inserts are ignored)."""
+    stmt = _UPSERT_INSERTS[dialect_name](model).values([{"user_id": user_id, "name": name} for name in names])
+    return stmt.on_conflict_do_nothing(index_elements=[model.user_id, model.name])
+
+
+def delete_cost_tags(cost_ids):
+    """Detaches all tags from the given costs (ids, or a SELECT of ids)."""
+    return delete(models.cost_tags).filter(models.cost_tags.c.cost_id.in_(cost_ids))
+
+
+# ------------------ ROLLUP ------------------
+def rollup_delta(dialect_name: str, user_id: int, count: int, total: Decimal):
+    """
+    Upsert that adds `count` / `total` to the user's `user_cost_totals` row
+    and bumps its `version` (the ETag of the user's cost responses).
+    Increments happen in SQL, so concurrent writers don't lose updates.
+    """
+    stmt = _UPSERT_INSERTS[dialect_name](models.UserCostTotal).values(
+        user_id=user_id, cost_count=count, amount_total=total, version=1
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[models.UserCostTotal.user_id],
+        set_={
+            "cost_count": models.UserCostTotal.cost_count + stmt.excluded.cost_count,
+            "amount_total": models.UserCostTotal.amount_total + stmt.excluded.amount_total,
+            "version": models.UserCostTotal.version + 1,
+        },
+    )
+
+
+def lock_rollup(dialect_name: str, user_id: int):
+    """
+    No-op `rollup_delta` run first in a transaction that reads amounts to
+    compute a delta: it write-locks the user's rollup row (the whole database
+    on SQLite), so concurrent writers of the user's costs take turns and the
+    amounts read after it stay current until commit.
+    """
+    return rollup_delta(dialect_name, user_id, 0, 0)
+
+
+def delete_owned_costs(user_id: int, ids):
+    """
+    Deletes the user's costs among `ids` (and their tag links), returning
+    (id, amount) of the rows this statement actually deleted: a cost deleted
+    concurrently by another request is not returned twice.
+    """
+    return delete(models.Cost).filter(
+        models.Cost.user_id == user_id, models.Cost.id.in_(ids)
+    ).returning(models.Cost.id, models.Cost.amount)
+
+
+def cost_data_version(user_id: int):
+    """The user's cost data version, bumped by every cost mutation (no row: never written)."""
+    return select(models.UserCostTotal.version).filter(models.UserCostTotal.user_id == user_id)
+
+
+def rollup_summary(user_id: int):
+    """
+    Unfiltered summary from the rollup row: count and total in O(1),
+    min and max as single seeks on ix_costs_user_id_amount.
+    """
+    def extreme(order):
+        return (
+            select(models.Cost.amount)
+            .filter(models.Cost.user_id == user_id)
+            .order_by(order)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    return select(
+        models.UserCostTotal.cost_count.label("count"),
+        models.UserCostTotal.amount_total.label("total"),
+        extreme(models.Cost.amount.asc()).label("min"),
+        extreme(models.Cost.amount.desc()).label("max"),
+    ).filter(models.UserCostTotal.user_id == user_id)
+
+
+def rollup_from_costs():
+    """What `user_cost_totals` should contain, aggregated from `costs`."""
+    return select(
+        models.Cost.user_id,
+        func.count(models.Cost.id).label("cost_count"),
+        func.sum(models.Cost.amount).label("amount_total"),
+    ).filter(models.Cost.user_id.is_not(None)).group_by(models.Cost.user_id)
+
+
+def rebuild_rollup():
+    """
+    Statements that recompute the whole rollup from `costs`.
+    Existing rows are updated in place with their `version` bumped, so
+    ETags handed out before the rebuild can never match again.
+    """
+    owned = models.Cost.user_id == models.UserCostTotal.user_id
+    fresh = rollup_from_costs().subquery()
+    return [
+        update(models.UserCostTotal).values(
+            cost_count=select(func.count(models.Cost.id)).filter(owned).scalar_subquery(),
+            amount_total=select(func.coalesce(func.sum(models.Cost.amount), 0)).filter(owned).scalar_subquery(),
+            version=models.UserCostTotal.version + 1,
+        ),
+        insert(models.UserCostTotal).from_select(
+            ["user_id", "cost_count", "amount_total", "version"],
+            select(fresh.c.user_id, fresh.c.cost_count, fresh.c.amount_total, literal(1)).filter(
+                fresh.c.user_id.not_in(select(models.UserCostTotal.user_id))
+            ),
+        ),
+    ]
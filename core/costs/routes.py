@@ -1,107 +1,610 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Annotated, AsyncIterable
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter, ValidationError
 from auth.jwt_auth import get_authenticated_user
 from costs import models, schemas
-from core.database import get_db
-from users.models import UserModel
+from costs.compact import encode_compact, select_compact
+from costs.http_cache import cached_response
+from costs.labels import category_id, resolve_labels, set_cost_tags
+from costs.queries import (
+    category_totals, cost_histogram, cost_summary, delete_cost_tags, delete_owned_costs, filter_costs, list_costs,
+    lock_rollup, mean, owned_cost, period_totals, rollup_delta, rollup_summary, search_costs, select_costs,
+    select_export, top_costs,
+)
+from costs.transfer import MEDIA_TYPES, ImportFormatError, LineTooLongError, encode_rows, iter_records
+from core.database import get_db, open_session
+from core.replicas import get_read_db, use_replica
+from users.schemas import UserPrincipalSchema
 
 router = APIRouter(tags=["costs"], prefix="/costs")
 
+# rows fetched per round-trip when streaming from a server-side cursor
+STREAM_CHUNK_SIZE = 500
+# bulk endpoints: rows per executemany statement / transaction, and per request
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ITEMS = 10_000
+# import: problems listed in the response (all of them are counted)
+IMPORT_MAX_ERRORS = 100
+
+# serializers of the cached (pre-rendered) JSON responses
+COST_LIST = TypeAdapter(list[schemas.CostResponse])
+PERIOD_TOTALS = TypeAdapter(list[schemas.CostPeriodTotal])
+CATEGORY_TOTALS = TypeAdapter(list[schemas.CostCategoryTotal])
+
+
+async def _stream_costs(stmt, format: str, replica: bool):
+    """
+    Yields the rows of `stmt` encoded as CSV or NDJSON from a server-side cursor.
+    Opens its own session because the body is sent after the handler returns.
+    """
+    async with open_session(replica=replica) as db:
+        rows = await db.stream(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        async for chunk in encode_rows(rows, format, STREAM_CHUNK_SIZE):
+            yield chunk
+
+
+async def _insert_costs(db: AsyncSession, user_id: int, costs: list[schemas.CostCreate]) -> list[int]:
+    """
+    One executemany INSERT for `costs` plus the matching rollup update;
+    categories and tags are resolved and attached in bulk.
+    Returns the new ids in input order; the caller commits.
+    """
+    category_ids = await resolve_labels(db, models.Category, user_id, (c.category for c in costs if c.category))
+    rows = [
+        {
+            "description": c.description,
+            "amount": c.amount,
+            "incurred_at": c.incurred_at,
+            "category_id": category_ids.get(c.category),
+            "user_id": user_id,
+        }
+        for c in costs
+    ]
+    result = await db.execute(
+        insert(models.Cost).returning(models.Cost.id, sort_by_parameter_order=True), rows
+    )
+    ids = result.scalars().all()
+    await set_cost_tags(db, user_id, {id: c.tags for id, c in zip(ids, costs) if c.tags}, replace=False)
+    await db.execute(rollup_delta(db.bind.dialect.name, user_id, len(rows), sum(c.amount for c in costs)))
+    return ids
+
 
 @router.post("/", response_model=schemas.CostResponse, status_code=status.HTTP_201_CREATED)
 async def create_cost(
     cost: schemas.CostCreate,
-    db: Session = Depends(get_db),
-    user: UserModel = Depends(get_authenticated_user)
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
 ):
     """
     Create a new cost entry for the authenticated user.
     Only authenticated users can create costs.
+    `category` and `tags` are created on first use.
     """
     db_cost = models.Cost(
         description=cost.description,
         amount=cost.amount,
+        incurred_at=cost.incurred_at,
+        category_id=await category_id(db, user.id, cost.category),
         user_id=user.id  # link cost to user
     )
     db.add(db_cost)
-    db.commit()
-    db.refresh(db_cost)
-    return db_cost
+    await db.flush()
+    await set_cost_tags(db, user.id, {db_cost.id: cost.tags}, replace=False)
+    await db.execute(rollup_delta(db.bind.dialect.name, user.id, 1, cost.amount))
+    await db.commit()
+    return await _reload_cost(db, db_cost.id, user.id)
+
+
+async def _reload_cost(db: AsyncSession, id: int, user_id: int) -> models.Cost:
+    """Fresh copy of a just-written cost with its category, tags and server defaults."""
+    result = await db.execute(owned_cost(id, user_id).execution_options(populate_existing=True))
+    return result.scalars().one()
 
 
 @router.get("/", response_model=list[schemas.CostResponse])
 async def get_costs(
-    db: Session = Depends(get_db),
-    user: UserModel = Depends(get_authenticated_user)
+    request: Request,
+    params: Annotated[schemas.CostListParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Return the costs that belong to the authenticated user, ordered by id.
+    - Keyset pagination: pass the `X-Next-Cursor` response header as `cursor`
+      to fetch the next page. The header is absent on the last page.
+    - Filters: `min_amount`, `max_amount`, `description_prefix`,
+      `incurred_from` / `incurred_to` (half-open range, UTC), `category`,
+      `tags` (repeatable; costs having all of them).
+    - `stream=true` streams every matching cost as NDJSON (no page limit).
+    - `compact=true` returns only `id`, `description` and `amount` per cost,
+      encoded straight from the rows (much cheaper for large pages).
+    - Pages carry an ETag; `If-None-Match` gets a 304 while the user's costs
+      are unchanged, and rendered pages are served from the response cache.
+    """
+    if params.stream:
+        stmt = list_costs(select_export(), user.id, params)
+        return StreamingResponse(_stream_costs(stmt, "ndjson", use_replica(user.id)), media_type=MEDIA_TYPES["ndjson"])
+
+    async def produce():
+        stmt = list_costs(select_compact() if params.compact else select_costs(), user.id, params)
+        # fetch one extra row to know whether another page exists
+        result = await db.execute(stmt.limit(params.limit + 1))
+        costs = result.all() if params.compact else result.scalars().all()
+
+        headers = {}
+        if len(costs) > params.limit:
+            costs = costs[:params.limit]
+            headers["X-Next-Cursor"] = str(costs[-1].id)
+        if params.compact:
+            return encode_compact(costs), headers
+        return COST_LIST.dump_json(COST_LIST.validate_python(costs, from_attributes=True)), headers
+
+    return await cached_response(request, db, user.id, produce)
+
+
+# ------------------ BULK ------------------
+def _chunks(items: list):
+    """Yields (offset, chunk) pairs of at most BULK_CHUNK_SIZE items."""
+    for start in range(0, len(items), BULK_CHUNK_SIZE):
+        yield start, items[start:start + BULK_CHUNK_SIZE]
+
+
+def _chunk_failed(start: int, chunk: list, error: SQLAlchemyError, ids=None) -> list[dict]:
+    detail = f"chunk rolled back: {error.__class__.__name__}"
+    return [
+        {"index": start + i, "id": ids[i] if ids else None, "status": "error", "detail": detail}
+        for i in range(len(chunk))
+    ]
+
+
+@router.post("/bulk", response_model=list[schemas.CostBulkResult])
+async def create_costs_bulk(
+    costs: Annotated[list[schemas.CostCreate], Body(max_length=BULK_MAX_ITEMS)],
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Create many costs for the authenticated user in one request.
+    - Each chunk of BULK_CHUNK_SIZE rows is one executemany INSERT plus one
+      rollup update, committed as its own transaction.
+    - A failing chunk is rolled back and its items are reported as `error`;
+      the other chunks are kept.
+    """
+    results = []
+    for start, chunk in _chunks(costs):
+        try:
+            ids = await _insert_costs(db, user.id, chunk)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            results.extend(_chunk_failed(start, chunk, e))
+            continue
+        results.extend({"index": start + i, "id": id, "status": "created"} for i, id in enumerate(ids))
+    return results
+
+
+@router.patch("/bulk", response_model=list[schemas.CostBulkResult])
+async def update_costs_bulk(
+    costs: Annotated[list[schemas.CostBulkUpdate], Body(max_length=BULK_MAX_ITEMS)],
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Update many costs of the authenticated user in one request.
+    - Costs that don't exist or belong to another user are reported as `not_found`.
+    - Each chunk locks the user's rollup row, then is one ownership SELECT, one
+      executemany UPDATE by id and one rollup update (plus bulk label
+      statements), committed as its own transaction. The lock keeps the amounts
+      read by the SELECT current, so concurrent updates don't skew the rollup.
+    - `category` / `tags` are only changed for items that include them.
+    """
+    results = []
+    for start, chunk in _chunks(costs):
+        await db.execute(lock_rollup(db.bind.dialect.name, user.id))
+        result = await db.execute(
+            select(models.Cost.id, models.Cost.amount).filter(
+                models.Cost.user_id == user.id,
+                models.Cost.id.in_({c.id for c in chunk}),
+            )
+        )
+        amounts = dict(result.all())
+
+        rows, delta, chunk_results, tags_by_cost = [], 0, [], {}
+        for i, item in enumerate(chunk, start):
+            if item.id not in amounts:
+                chunk_results.append({"index": i, "id": item.id, "status": "not_found"})
+                continue
+            # track the running amount so repeated ids produce the right delta
+            delta += item.amount - amounts[item.id]
+            amounts[item.id] = item.amount
+            row = {"id": item.id, "description": item.description, "amount": item.amount}
+            if item.incurred_at is not None:
+                row["incurred_at"] = item.incurred_at
+            if "category" in item.model_fields_set:
+                row["category"] = item.category
+            if "tags" in item.model_fields_set:
+                tags_by_cost[item.id] = item.tags or []
+            rows.append(row)
+            chunk_results.append({"index": i, "id": item.id, "status": "updated"})
+
+        try:
+            if rows:
+                category_ids = await resolve_labels(
+                    db, models.Category, user.id, (row["category"] for row in rows if row.get("category"))
+                )
+                for row in rows:
+                    if "category" in row:
+                        row["category_id"] = category_ids.get(row.pop("category"))
+                await db.execute(update(models.Cost), rows)
+                await set_cost_tags(db, user.id, tags_by_cost)
+                await db.execute(rollup_delta(db.bind.dialect.name, user.id, 0, delta))
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            results.extend(_chunk_failed(start, chunk, e, [c.id for c in chunk]))
+            continue
+        results.extend(chunk_results)
+    return results
+
+
+@router.delete("/bulk", response_model=list[schemas.CostBulkResult])
+async def delete_costs_bulk(
+    ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)],
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Delete many costs of the authenticated user in one request (body: list of ids).
+    - Costs that don't exist or belong to another user are reported as `not_found`.
+    - Each chunk is one tag DELETE, one DELETE ... WHERE id IN (...) RETURNING
+      and one rollup update, committed as its own transaction. Only the rows
+      the DELETE returned count: a cost deleted concurrently by another request
+      is `not_found` here and isn't subtracted twice.
+    """
+    results = []
+    for start, chunk in _chunks(ids):
+        try:
+            await db.execute(delete_cost_tags(
+                select(models.Cost.id).filter(models.Cost.user_id == user.id, models.Cost.id.in_(set(chunk)))
+            ))
+            amounts = dict((await db.execute(delete_owned_costs(user.id, set(chunk)))).all())
+            if amounts:
+                await db.execute(
+                    rollup_delta(db.bind.dialect.name, user.id, -len(amounts), -sum(amounts.values()))
+                )
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            results.extend(_chunk_failed(start, chunk, e, chunk))
+            continue
+        # a repeated id is only deleted once
+        results.extend(
+            {"index": i, "id": id, "status": "deleted" if amounts.pop(id, None) is not None else "not_found"}
+            for i, id in enumerate(chunk, start)
+        )
+    return results
+
+
+# ------------------ IMPORT / EXPORT ------------------
+def _validation_detail(error: ValidationError) -> str:
+    """One-line summary of a pydantic error, e.g. "amount: Input should be ... >= 0"."""
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    )
+
+
+@router.get("/export")
+async def export_costs(
+    params: Annotated[schemas.CostExportParams, Query()],
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Download the authenticated user's costs as CSV
+    (`id,description,amount,incurred_at,category,tags`, tags separated by `;`)
+    or NDJSON, streamed from a server-side cursor (`yield_per`).
+    Accepts the same filters as the listing.
+    """
+    stmt = filter_costs(select_export(), user.id, params).order_by(models.Cost.id)
+    return StreamingResponse(
+        _stream_costs(stmt, params.format, use_replica(user.id)),
+        media_type=MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f'attachment; filename="costs.{params.format}"'},
+    )
+
+
+@router.post("/import", response_model=schemas.CostImportResult)
+async def import_costs(
+    request: Request,
+    params: Annotated[schemas.CostImportParams, Query()],
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
 ):
     """
-    Return all costs that belong to the authenticated user.
+    Import costs from a CSV or NDJSON request body (e.g. `curl --data-binary @costs.csv`).
+    - The body is parsed line by line as it arrives; CSV needs a header with
+      `description` and `amount` (`incurred_at`, `category` and `tags`,
+      separated by `;`, are optional, an `id` column is ignored), so an
+      export can be imported as-is, labels included.
+    - Each row is validated against CostCreate; invalid rows are skipped and reported.
+    - Valid rows are inserted in chunks of BULK_CHUNK_SIZE, one transaction each.
+    - 413 when a line is longer than MAX_LINE_LENGTH (costs/transfer.py);
+      chunks inserted before that line stay imported.
     """
-    return db.query(models.Cost).filter(models.Cost.user_id == user.id).all()
+    try:
+        return await import_records(db, user.id, request.stream(), params.format)
+    except LineTooLongError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def import_records(db: AsyncSession, user_id: int, chunks: AsyncIterable[bytes], format: str) -> dict:
+    """
+    Validates and inserts the costs of a CSV / NDJSON byte stream for the
+    import endpoint and import jobs; returns the CostImportResult fields.
+
+    Raises:
+    - ImportFormatError if the CSV header lacks required columns, or
+      LineTooLongError if a line exceeds MAX_LINE_LENGTH.
+    """
+    imported, failed, errors = 0, 0, []
+    batch: list[tuple[int, schemas.CostCreate]] = []
+
+    def report(line: int, detail: str) -> None:
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"line": line, "detail": detail})
+
+    async def flush() -> None:
+        nonlocal imported, failed
+        try:
+            await _insert_costs(db, user_id, [cost for _, cost in batch])
+            await db.commit()
+            imported += len(batch)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            failed += len(batch)
+            report(batch[0][0], f"lines {batch[0][0]}-{batch[-1][0]} rolled back: {e.__class__.__name__}")
+        batch.clear()
+
+    async for line, record in iter_records(chunks, format):
+        if isinstance(record, Exception):
+            failed += 1
+            report(line, f"invalid JSON: {record}")
+            continue
+        try:
+            batch.append((line, schemas.CostCreate.model_validate(record)))
+        except ValidationError as e:
+            failed += 1
+            report(line, _validation_detail(e))
+            continue
+        if len(batch) >= BULK_CHUNK_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+
+# ------------------ SUMMARIES ------------------
+@router.get("/summary", response_model=schemas.CostSummary)
+async def get_cost_summary(
+    request: Request,
+    params: Annotated[schemas.CostFilterParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Count, total, min, max and mean amount of the user's costs, computed in SQL.
+    Accepts the same filters as the listing.
+    - Without filters the answer comes from the `user_cost_totals` rollup.
+    - ETag / response cache as for the listing.
+    """
+    async def produce():
+        if params.model_dump(exclude_defaults=True):
+            row = (await db.execute(cost_summary(user.id, params))).one()
+        else:
+            row = (await db.execute(rollup_summary(user.id))).first()
+        if not row or not row.count:
+            summary = {"count": 0, "total": 0, "min": None, "max": None, "mean": None}
+        else:
+            summary = {**row._asdict(), "mean": mean(row.total, row.count)}
+        return schemas.CostSummary.model_validate(summary).model_dump_json().encode(), {}
+
+    return await cached_response(request, db, user.id, produce)
+
+
+@router.get("/summary/histogram", response_model=schemas.CostHistogram)
+async def get_cost_histogram(
+    request: Request,
+    params: Annotated[schemas.CostHistogramParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Count and total of the user's costs per amount bucket of width `bucket_size`.
+    Empty buckets are omitted.
+    """
+    async def produce():
+        result = await db.execute(cost_histogram(user.id, params))
+        buckets = [
+            {
+                "lower": row.bucket * params.bucket_size,
+                "upper": (row.bucket + 1) * params.bucket_size,
+                "count": row.count,
+                "total": row.total,
+            }
+            for row in result
+        ]
+        histogram = schemas.CostHistogram(bucket_size=params.bucket_size, buckets=buckets)
+        return histogram.model_dump_json().encode(), {}
+
+    return await cached_response(request, db, user.id, produce)
+
+
+@router.get("/summary/periods", response_model=list[schemas.CostPeriodTotal])
+async def get_cost_period_totals(
+    request: Request,
+    params: Annotated[schemas.CostPeriodParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Count and total of the user's costs per day, week or month of `incurred_at`
+    (e.g. this month's spend: `period=month&incurred_from=2026-10-01`).
+    Periods without costs are omitted.
+    """
+    async def produce():
+        result = await db.execute(period_totals(db.bind.dialect.name, user.id, params))
+        return PERIOD_TOTALS.dump_json(PERIOD_TOTALS.validate_python(result.all(), from_attributes=True)), {}
+
+    return await cached_response(request, db, user.id, produce)
+
+
+@router.get("/summary/categories", response_model=list[schemas.CostCategoryTotal])
+async def get_cost_category_totals(
+    request: Request,
+    params: Annotated[schemas.CostFilterParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Count and total of the user's costs per category (`null`: uncategorized),
+    largest total first, in one GROUP BY. Accepts the same filters as the listing.
+    """
+    async def produce():
+        result = await db.execute(category_totals(user.id, params))
+        return CATEGORY_TOTALS.dump_json(CATEGORY_TOTALS.validate_python(result.all(), from_attributes=True)), {}
+
+    return await cached_response(request, db, user.id, produce)
+
+
+@router.get("/summary/top", response_model=list[schemas.CostResponse])
+async def get_top_costs(
+    request: Request,
+    params: Annotated[schemas.CostTopParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    The user's `n` largest costs by amount.
+    """
+    async def produce():
+        result = await db.execute(top_costs(user.id, params))
+        return COST_LIST.dump_json(COST_LIST.validate_python(result.scalars().all(), from_attributes=True)), {}
+
+    return await cached_response(request, db, user.id, produce)
+
+
+@router.get("/search", response_model=list[schemas.CostResponse])
+async def search_costs_by_description(
+    request: Request,
+    params: Annotated[schemas.CostSearchParams, Query()],
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Full-text search of the user's cost descriptions, best match first.
+    - `q`: every word must occur in the description; the last word also
+      matches as a prefix (`lun` finds "Lunch payment").
+    - Accepts the same filters as the cost list.
+    - Offset pagination: pass the `X-Next-Offset` response header as `offset`
+      to fetch the next page. The header is absent on the last page.
+    """
+    async def produce():
+        stmt = search_costs(db.bind.dialect.name, user.id, params)
+        # fetch one extra row to know whether another page exists
+        result = await db.execute(stmt.offset(params.offset).limit(params.limit + 1))
+        costs = result.scalars().all()
+
+        headers = {}
+        if len(costs) > params.limit:
+            costs = costs[:params.limit]
+            headers["X-Next-Offset"] = str(params.offset + params.limit)
+        return COST_LIST.dump_json(COST_LIST.validate_python(costs, from_attributes=True)), headers
+
+    return await cached_response(request, db, user.id, produce)
 
 
 @router.get("/{id}/", response_model=schemas.CostResponse)
 async def get_cost(
     id: int,
-    db: Session = Depends(get_db),
-    user: UserModel = Depends(get_authenticated_user)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
 ):
     """
     Get a specific cost by ID, only if it belongs to the authenticated user.
+    Carries an ETag (`If-None-Match` -> 304); single rows aren't cached.
     """
-    cost = db.query(models.Cost).filter(
-        models.Cost.id == id,
-        models.Cost.user_id == user.id
-    ).first()
+    async def produce():
+        result = await db.execute(owned_cost(id, user.id))
+        cost = result.scalars().first()
 
-    if not cost:
-        raise HTTPException(status_code=404, detail="Cost not found or not owned by this user")
+        if not cost:
+            raise HTTPException(status_code=404, detail="Cost not found or not owned by this user")
+
+        return schemas.CostResponse.model_validate(cost, from_attributes=True).model_dump_json().encode(), {}
 
-    return cost
+    return await cached_response(request, db, user.id, produce, cache=False)
 
 
 @router.put("/{id}/", response_model=schemas.CostResponse)
 async def update_cost(
     id: int,
     updated: schemas.CostUpdate,
-    db: Session = Depends(get_db),
-    user: UserModel = Depends(get_authenticated_user)
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
 ):
     """
     Update a cost if it belongs to the authenticated user.
+    `category` / `tags` are only changed when present in the body.
+    The user's rollup row is locked first, so the old amount read here is
+    still current when the rollup delta is committed.
     """
-    cost = db.query(models.Cost).filter(
-        models.Cost.id == id,
-        models.Cost.user_id == user.id
-    ).first()
+    await db.execute(lock_rollup(db.bind.dialect.name, user.id))
+    result = await db.execute(owned_cost(id, user.id))
+    cost = result.scalars().first()
 
     if not cost:
         raise HTTPException(status_code=404, detail="Cost not found or not owned by this user")
 
+    await db.execute(rollup_delta(db.bind.dialect.name, user.id, 0, updated.amount - cost.amount))
     cost.description = updated.description
     cost.amount = updated.amount
-    db.commit()
-    db.refresh(cost)
-    return cost
+    if updated.incurred_at is not None:
+        cost.incurred_at = updated.incurred_at
+    if "category" in updated.model_fields_set:
+        cost.category_id = await category_id(db, user.id, updated.category)
+    if "tags" in updated.model_fields_set:
+        await set_cost_tags(db, user.id, {cost.id: updated.tags or []})
+    await db.commit()
+    return await _reload_cost(db, id, user.id)
 
 
 @router.delete("/{id}/", status_code=status.HTTP_200_OK)
 async def delete_cost(
     id: int,
-    db: Session = Depends(get_db),
-    user: UserModel = Depends(get_authenticated_user)
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
 ):
     """
     Delete a cost if it belongs to the authenticated user.
+    The rollup is only decremented by the request whose DELETE removed the
+    row; concurrent deletes of the same cost get 404.
     """
-    cost = db.query(models.Cost).filter(
-        models.Cost.id == id,
-        models.Cost.user_id == user.id
-    ).first()
+    await db.execute(delete_cost_tags(
+        select(models.Cost.id).filter(models.Cost.id == id, models.Cost.user_id == user.id)
+    ))
+    deleted = (await db.execute(delete_owned_costs(user.id, [id]))).first()
 
-    if not cost:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Cost not found or not owned by this user")
 
-    db.delete(cost)
-    db.commit()
+    await db.execute(rollup_delta(db.bind.dialect.name, user.id, -1, -deleted.amount))
+    await db.commit()
     return {"message": f"Cost with ID {id} deleted successfully"}
@@ -1,16 +1,158 @@
-from typing import Annotated
-from pydantic import BaseModel, Field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Annotated, Literal, Optional
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints, field_validator
+from costs.money import MONEY_DECIMAL_PLACES
+
+# exact amount (stored as integer cents); accepts numbers or strings, serialized as a decimal string
+Amount = Annotated[Decimal, Field(max_digits=18, decimal_places=MONEY_DECIMAL_PLACES)]
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+# timestamps are stored as naive UTC; aware inputs are converted, naive ones taken as UTC
+UtcDatetime = Annotated[datetime, AfterValidator(_to_naive_utc)]
+
+# category / tag name, unique per user
+Label = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=50)]
+MAX_TAGS = 20
 
 class CostBase(BaseModel):
     description: Annotated[str, Field(min_length=3, pattern=r'^[a-zA-Z0-9 ]+$', example="Lunch payment")]
-    amount: Annotated[float, Field(ge=0, example=150.75)]
+    amount: Annotated[Amount, Field(ge=0, example="150.75")]
 
 class CostCreate(CostBase):
-    pass
+    incurred_at: Annotated[UtcDatetime, Field(default_factory=utc_now, description="When the cost was incurred (default: now)")]
+    category: Annotated[Optional[Label], Field(description="Category name, created on first use", example="Food")] = None
+    tags: Annotated[list[Label], Field(max_length=MAX_TAGS, description="Tag names, created on first use")] = []
 
 
 class CostUpdate(CostBase):
-    pass
+    """`category` and `tags` are unchanged when omitted; null clears them."""
+    incurred_at: Annotated[Optional[UtcDatetime], Field(description="Unchanged when omitted")] = None
+    category: Optional[Label] = None
+    tags: Annotated[Optional[list[Label]], Field(max_length=MAX_TAGS)] = None
 
 class CostResponse(CostBase):
-    id: int
\ No newline at end of file
+    id: int
+    incurred_at: datetime
+    created_at: datetime
+    category: Optional[str] = None
+    tags: list[str] = []
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def _category_name(cls, value):
+        return getattr(value, "name", value)
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _tag_names(cls, value):
+        return [getattr(tag, "name", tag) for tag in value]
+
+
+class CostBulkUpdate(CostUpdate):
+    id: int
+
+
+class CostBulkResult(BaseModel):
+    """Outcome of one item of a bulk request, in request order."""
+    index: int
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "not_found", "error"]
+    detail: Optional[str] = None
+
+class CostFilterParams(BaseModel):
+    """Query parameters shared by the listing and summary endpoints."""
+    min_amount: Annotated[Optional[Amount], Field(ge=0, description="Only costs with amount >= min_amount")] = None
+    max_amount: Annotated[Optional[Amount], Field(ge=0, description="Only costs with amount <= max_amount")] = None
+    description_prefix: Annotated[Optional[str], Field(min_length=1, description="Only costs whose description starts with this text")] = None
+    incurred_from: Annotated[Optional[UtcDatetime], Field(description="Only costs incurred at or after this time")] = None
+    incurred_to: Annotated[Optional[UtcDatetime], Field(description="Only costs incurred before this time")] = None
+    category: Annotated[Optional[Label], Field(description="Only costs in this category")] = None
+    tags: Annotated[list[Label], Field(max_length=MAX_TAGS, description="Only costs that have all of these tags")] = []
+
+
+class CostListParams(CostFilterParams):
+    """Query parameters for listing costs (keyset pagination + filters)."""
+    limit: Annotated[int, Field(ge=1, le=1000, description="Maximum number of costs per page")] = 100
+    cursor: Annotated[Optional[int], Field(ge=0, description="Return costs with an id greater than this value (X-Next-Cursor of the previous page)")] = None
+    stream: Annotated[bool, Field(description="Stream every matching cost as NDJSON instead of returning one page")] = False
+    compact: Annotated[bool, Field(description="Return only id, description and amount per cost (faster for large pages)")] = False
+
+
+class CostSearchParams(CostFilterParams):
+    """Query parameters for full-text search (offset pagination + filters)."""
+    q: Annotated[str, Field(min_length=1, max_length=200, pattern=r'[a-zA-Z0-9]', description="Words the description must contain; the last one may be a prefix")]
+    limit: Annotated[int, Field(ge=1, le=100, description="Maximum number of costs per page")] = 20
+    offset: Annotated[int, Field(ge=0, le=10_000, description="Number of matches to skip (X-Next-Offset of the previous page)")] = 0
+
+
+class CostExportParams(CostFilterParams):
+    format: Annotated[Literal["csv", "ndjson"], Field(description="File format of the export")] = "csv"
+
+
+class CostImportParams(BaseModel):
+    format: Annotated[Literal["csv", "ndjson"], Field(description="File format of the request body")] = "csv"
+
+
+class CostHistogramParams(CostFilterParams):
+    bucket_size: Annotated[Amount, Field(gt=0, description="Width of each amount bucket")] = Decimal(100)
+
+
+class CostPeriodParams(CostFilterParams):
+    period: Annotated[Literal["day", "week", "month"], Field(description="Bucket width (weeks start on Monday, UTC)")] = "day"
+
+
+class CostTopParams(CostFilterParams):
+    n: Annotated[int, Field(ge=1, le=100, description="Number of costs to return")] = 10
+
+
+class CostSummary(BaseModel):
+    count: int
+    total: Decimal
+    min: Optional[Decimal]
+    max: Optional[Decimal]
+    mean: Optional[Decimal]  # rounded to cents
+
+
+class CostHistogramBucket(BaseModel):
+    lower: Decimal
+    upper: Decimal
+    count: int
+    total: Decimal
+
+
+class CostPeriodTotal(BaseModel):
+    start: date
+    count: int
+    total: Decimal
+
+
+class CostCategoryTotal(BaseModel):
+    category: Optional[str]  # null: costs without a category
+    count: int
+    total: Decimal
+
+
+class CostHistogram(BaseModel):
+    bucket_size: Decimal
+    buckets: list[CostHistogramBucket]
+
+
+class CostImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class CostImportResult(BaseModel):
+    imported: int
+    failed: int
+    # only the first IMPORT_MAX_ERRORS problems are listed; `failed` counts all of them
+    errors: list[CostImportError]
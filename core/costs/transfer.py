@@ -0,0 +1,139 @@
+"""
+Incremental CSV / NDJSON encoding and decoding of costs for the export,
+import and streaming-list endpoints. Nothing here holds more than one
+chunk of rows or one line of input in memory.
+"""
+import codecs
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator
+from costs.queries import TAG_SEPARATOR
+
+# column order of exported files; imports ignore `id`
+CSV_COLUMNS = ["id", "description", "amount", "incurred_at", "category", "tags"]
+# between the tag names of a CSV cell
+CSV_TAG_SEPARATOR = ";"
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+# longest accepted line of an upload, in characters; a cost row is far shorter
+MAX_LINE_LENGTH = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The upload can't be parsed at all (e.g. missing CSV columns)."""
+
+
+class LineTooLongError(ImportFormatError):
+    """A line of the upload is longer than MAX_LINE_LENGTH."""
+
+
+# ------------------ ENCODING ------------------
+def _csv_line(writer, buffer: io.StringIO, values) -> str:
+    buffer.seek(0)
+    buffer.truncate()
+    writer.writerow(values)
+    return buffer.getvalue()
+
+
+async def encode_rows(rows: AsyncIterable, format: str, chunk_size: int) -> AsyncIterator[str]:
+    """
+    Encodes `select_export` rows (id, description, amount, incurred_at,
+    category, tags) as CSV (with header) or NDJSON.
+    Lines are yielded in chunks of `chunk_size` rows to keep the number of
+    ASGI send calls low.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    lines = []
+    if format == "csv":
+        lines.append(_csv_line(writer, buffer, CSV_COLUMNS))
+
+    async for row in rows:
+        tags = sorted(row.tags.split(TAG_SEPARATOR)) if row.tags else []
+        if format == "csv":
+            lines.append(_csv_line(writer, buffer, (
+                row.id, row.description, row.amount, row.incurred_at.isoformat(),
+                row.category or "", CSV_TAG_SEPARATOR.join(tags),
+            )))
+        else:
+            # amounts as decimal strings, like the JSON API
+            lines.append(json.dumps({
+                "description": row.description,
+                "amount": str(row.amount),
+                "incurred_at": row.incurred_at.isoformat(),
+                "category": row.category,
+                "tags": tags,
+                "id": row.id,
+            }) + "\n")
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines.clear()
+
+    if lines:
+        yield "".join(lines)
+
+
+# ------------------ DECODING ------------------
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """
+    Splits a UTF-8 byte stream (optionally with BOM) into lines as it arrives.
+
+    Raises:
+    - LineTooLongError as soon as a line exceeds MAX_LINE_LENGTH, so an upload
+      without newlines can't grow the buffer without bound.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            if len(line) > MAX_LINE_LENGTH:
+                raise LineTooLongError(f"Line {line_no} is longer than {MAX_LINE_LENGTH} characters")
+            yield line.rstrip("\r")
+        if len(pending) > MAX_LINE_LENGTH:
+            raise LineTooLongError(f"Line {line_no + 1} is longer than {MAX_LINE_LENGTH} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterable[bytes], format: str) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yields (line number, record) for each non-empty line of the upload.
+    CSV records are dicts keyed by the header row (`tags` split on
+    CSV_TAG_SEPARATOR); NDJSON records are the decoded JSON values
+    (validated later), or the JSONDecodeError itself.
+
+    Raises:
+    - ImportFormatError if the CSV header lacks `description` or `amount`.
+    """
+    header = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        if format == "ndjson":
+            try:
+                # numbers as Decimal so 0.1 stays exactly 0.1
+                yield line_no, json.loads(line, parse_float=Decimal)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            missing = {"description", "amount"} - set(header)
+            if missing:
+                raise ImportFormatError(f"CSV header is missing column(s): {', '.join(sorted(missing))}")
+            continue
+        # empty cells (e.g. no incurred_at) fall back to the field defaults
+        record = {column: value for column, value in zip(header, values) if value != ""}
+        if "tags" in record:
+            record["tags"] = [tag for tag in record["tags"].split(CSV_TAG_SEPARATOR) if tag.strip()]
+        yield line_no, record
@@ -0,0 +1,81 @@
+"""
+Job kinds: what each background job runs and who may submit it.
+
+Handlers are coroutines `handler(db, job, params, output) -> (media type,
+filename)`, `params` being the job's parameters validated as the kind's
+`params` model, that write their result to the binary file `output`
+(jobs/storage.py), as they go, for download. They run in a worker thread
+(or process, for `cpu_bound` kinds) on a private event loop, with a
+`SessionLocal` session behind `SyncSessionAdapter`, so the async helpers of
+the routers (import, export) are reused unchanged.
+"""
+import json
+from dataclasses import dataclass
+from typing import Awaitable, BinaryIO, Callable
+from pydantic import BaseModel
+from costs import models, schemas
+from costs.commands import rollup_drift
+from costs.queries import filter_costs, rebuild_rollup, select_export
+from costs.routes import STREAM_CHUNK_SIZE, import_records
+from costs.transfer import MEDIA_TYPES, encode_rows
+from jobs.models import Job
+from jobs.storage import payload_path, read_file
+from reports.schemas import SpendReportParams
+
+# (media type, download filename) of the result written by a handler
+JobOutput = tuple[str, str]
+
+
+class NoParams(BaseModel):
+    pass
+
+
+@dataclass(frozen=True)
+class JobKind:
+    handler: Callable[..., Awaitable[JobOutput]]
+    params: type[BaseModel]
+    # runs in the process pool when JOB_PROCESS_WORKERS > 0
+    cpu_bound: bool = False
+
+
+def _json(value) -> bytes:
+    return json.dumps(value).encode()
+
+
+async def export_costs(db, job: Job, params: schemas.CostExportParams, output: BinaryIO) -> JobOutput:
+    stmt = filter_costs(select_export(), job.user_id, params).order_by(models.Cost.id)
+    rows = await db.stream(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+    async for chunk in encode_rows(rows, params.format, STREAM_CHUNK_SIZE):
+        output.write(chunk.encode())
+    return MEDIA_TYPES[params.format], f"costs.{params.format}"
+
+
+async def import_costs(db, job: Job, params: schemas.CostImportParams, output: BinaryIO) -> JobOutput:
+    result = await import_records(db, job.user_id, read_file(payload_path(job.id)), params.format)
+    output.write(_json(result))
+    return "application/json", "import.json"
+
+
+async def rebuild_costs_rollup(db, job: Job, params: NoParams, output: BinaryIO) -> JobOutput:
+    problems = rollup_drift(db.sync_session)
+    for stmt in rebuild_rollup():
+        await db.execute(stmt)
+    await db.commit()
+    output.write(_json({"drift": problems}))
+    return "application/json", "rollup.json"
+
+
+async def spend_report(db, job: Job, params: SpendReportParams, output: BinaryIO) -> JobOutput:
+    from reports.spend import build_spend_report  # NumPy is imported on first use, not at startup
+
+    report = build_spend_report(params)
+    output.write(report.model_dump_json().encode())
+    return "application/json", "spend-report.json"
+
+
+JOB_KINDS: dict[str, JobKind] = {
+    "export": JobKind(export_costs, schemas.CostExportParams),
+    "import": JobKind(import_costs, schemas.CostImportParams),
+    "rebuild-rollup": JobKind(rebuild_costs_rollup, NoParams),
+    "spend-report": JobKind(spend_report, SpendReportParams, cpu_bound=True),
+}
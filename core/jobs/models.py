@@ -0,0 +1,35 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.sql import func
+from core.database import Base
+
+# job lifecycle: queued -> running -> succeeded | failed
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class Job(Base):
+    """
+    A unit of background work (jobs/handlers.py) and its outcome.
+    The row is the source of truth; brokers only carry job ids.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # a user's jobs, newest first
+        Index("ix_jobs_user_id_id", "user_id", "id"),
+        # queued jobs to pick up again at startup
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    # validated parameters of the kind, as JSON
+    params = Column(Text, nullable=False, default="{}")
+    # the uploaded input (e.g. the file of an import) and the downloadable
+    # result are files, see jobs/storage.py
+    result_media_type = Column(String(100), nullable=True)
+    result_filename = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
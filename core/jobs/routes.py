@@ -0,0 +1,135 @@
+from typing import Annotated, Optional
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.jwt_auth import get_admin_user, get_authenticated_user
+from costs import schemas as cost_schemas
+from core.database import get_db
+from jobs import schemas
+from jobs.handlers import NoParams
+from jobs.models import Job
+from jobs.storage import UploadTooLargeError, receive_upload, result_path
+from jobs.worker import submit_job
+from reports.schemas import SpendReportParams
+from users.schemas import UserPrincipalSchema
+
+router = APIRouter(tags=["jobs"], prefix="/jobs")
+
+
+async def _submit(
+    request: Request, db: AsyncSession, user_id: int, kind: str, params, payload: Optional[Path] = None
+) -> Response:
+    job = await submit_job(db, user_id, kind, params, payload)
+    body = schemas.JobResponse.model_validate(job).model_dump_json()
+    return Response(
+        body,
+        status_code=status.HTTP_202_ACCEPTED,
+        media_type="application/json",
+        # where to poll the status
+        headers={"Location": str(request.url_for("get_job", id=job.id))},
+    )
+
+
+# ------------------ SUBMIT ------------------
+@router.post("/export", response_model=schemas.JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_export(
+    request: Request,
+    params: Annotated[cost_schemas.CostExportParams, Query()],
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Export the authenticated user's costs in the background (same format and
+    filters as GET /costs/export). Poll GET /jobs/{id}, then download
+    GET /jobs/{id}/result.
+    """
+    return await _submit(request, db, user.id, "export", params)
+
+
+@router.post("/import", response_model=schemas.JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_import(
+    request: Request,
+    params: Annotated[cost_schemas.CostImportParams, Query()],
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Import a CSV or NDJSON request body in the background (same rules as
+    POST /costs/import). The result is the CostImportResult JSON.
+    The body is written to the job's file as it arrives, never held in memory.
+    - 413 once the body exceeds JOB_UPLOAD_MAX_BYTES.
+    """
+    try:
+        payload = await receive_upload(request.stream())
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return await _submit(request, db, user.id, "import", params, payload)
+
+
+@router.post("/rebuild-rollup", response_model=schemas.JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_rollup_rebuild(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    admin: UserPrincipalSchema = Depends(get_admin_user)
+):
+    """
+    Admins: rebuild `user_cost_totals` from `costs` (like
+    `python -m costs.commands rebuild-rollup`). The result lists the drift found.
+    """
+    return await _submit(request, db, admin.id, "rebuild-rollup", NoParams())
+
+
+@router.post("/spend-report", response_model=schemas.JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_spend_report(
+    request: Request,
+    params: Annotated[SpendReportParams, Query()],
+    db: AsyncSession = Depends(get_db),
+    admin: UserPrincipalSchema = Depends(get_admin_user)
+):
+    """
+    Admins: compute the org-wide spend report (GET /admin/reports/spend) in
+    the background, in the process pool when JOB_PROCESS_WORKERS > 0.
+    """
+    return await _submit(request, db, admin.id, "spend-report", params)
+
+
+# ------------------ STATUS / RESULT ------------------
+async def _owned_job(db: AsyncSession, id: int, user_id: int) -> Job:
+    job = await db.scalar(select(Job).filter(Job.id == id, Job.user_id == user_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or not owned by this user")
+    return job
+
+
+@router.get("/{id}", response_model=schemas.JobResponse)
+async def get_job(
+    id: int,
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """Status of one of the authenticated user's jobs."""
+    return await _owned_job(db, id, user.id)
+
+
+@router.get("/{id}/result")
+async def get_job_result(
+    id: int,
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipalSchema = Depends(get_authenticated_user)
+):
+    """
+    Download the result of a finished job, streamed from its file.
+    - 409 while it is queued or running (with Retry-After), or if it failed.
+    - 404 if the result file is gone (e.g. JOB_STORAGE_DIR isn't shared).
+    """
+    job = await _owned_job(db, id, user.id)
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}", headers={"Retry-After": "1"})
+    path = result_path(job.id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Job result not found")
+    return FileResponse(path, media_type=job.result_media_type, filename=job.result_filename)
@@ -0,0 +1,73 @@
+"""
+Files of background jobs: the uploaded input and the downloadable result.
+
+- Stored under JOB_STORAGE_DIR as `<job id>.payload` / `<job id>.result`.
+- Uploads are written to disk as the request body arrives, results as the
+  handler produces them, and both are read back in chunks of CHUNK_SIZE, so
+  no job ever holds a whole import or export in memory.
+- Uploads stop with UploadTooLargeError (and the partial file is removed)
+  once they exceed JOB_UPLOAD_MAX_BYTES.
+- A file is written under a temporary name and renamed when complete, so
+  a download never sees half a result.
+"""
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator
+import anyio
+from core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """The request body is longer than JOB_UPLOAD_MAX_BYTES."""
+
+
+def storage_dir() -> Path:
+    path = Path(settings.JOB_STORAGE_DIR or os.path.join(tempfile.gettempdir(), "cost-jobs"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def payload_path(job_id: int) -> Path:
+    return storage_dir() / f"{job_id}.payload"
+
+
+def result_path(job_id: int) -> Path:
+    return storage_dir() / f"{job_id}.result"
+
+
+def temporary_path() -> Path:
+    """A fresh name in the storage directory, for a file still being written."""
+    return storage_dir() / f"{uuid.uuid4().hex}.tmp"
+
+
+async def receive_upload(chunks: AsyncIterable[bytes]) -> Path:
+    """
+    Writes a request body to a temporary file as it arrives; returns its path.
+
+    Raises:
+    - UploadTooLargeError as soon as more than JOB_UPLOAD_MAX_BYTES arrived.
+    """
+    path = temporary_path()
+    received = 0
+    try:
+        async with await anyio.open_file(path, "wb") as file:
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > settings.JOB_UPLOAD_MAX_BYTES:
+                    raise UploadTooLargeError(f"Upload is larger than {settings.JOB_UPLOAD_MAX_BYTES} bytes")
+                await file.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+async def read_file(path: Path) -> AsyncIterator[bytes]:
+    """Yields a file in chunks of CHUNK_SIZE (blocking reads: for job threads and processes)."""
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
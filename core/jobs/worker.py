@@ -0,0 +1,184 @@
+"""
+Background execution of jobs (jobs/handlers.py).
+
+- The API inserts a `jobs` row, then publishes its id to the broker.
+- JOB_WORKERS asyncio workers consume ids and run each job in a thread pool,
+  or in a process pool (JOB_PROCESS_WORKERS > 0) for CPU-bound kinds, so a
+  job never holds the event loop that serves requests.
+- A job is claimed with a conditional UPDATE (queued -> running), so an id
+  published twice, or re-published at startup by several processes, still
+  runs once.
+- Every job opens its own `SessionLocal` session in the thread or process
+  that runs it; sessions are never shared between threads, and forked
+  processes drop the connections inherited from the parent's pool.
+- Uploads and results are files (jobs/storage.py): a handler writes its
+  result to a temporary file, renamed to the job's result once it succeeded.
+- Jobs still queued at startup are published again. A job that was running
+  when its process died stays `running`.
+- The broker is the only part that knows how ids travel. `InProcessBroker`
+  is an asyncio.Queue of this process; an external broker (Redis, a message
+  queue, ...) only has to provide `publish` and `consume`.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import func, select, update
+from core.config import settings
+from core import database
+from core.database import SessionLocal, SyncSessionAdapter
+from jobs.handlers import JOB_KINDS
+from jobs.models import Job
+from jobs.storage import payload_path, result_path, temporary_path
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------ BROKER ------------------
+class InProcessBroker:
+    """Job ids handed from the API to the workers of the same process."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+
+    async def publish(self, job_id: int) -> None:
+        self._queue.put_nowait(job_id)
+
+    async def consume(self) -> int:
+        return await self._queue.get()
+
+
+# ------------------ EXECUTION ------------------
+# module-level so they can be pickled for the process pool
+def _init_worker_process() -> None:
+    # connections of a forked parent's pool must not be used by the child
+    database.engine.dispose(close=False)
+
+
+def queued_job_ids() -> list[int]:
+    with SessionLocal() as db:
+        return list(db.scalars(select(Job.id).filter(Job.status == "queued").order_by(Job.id)))
+
+
+def claim_job(job_id: int) -> Optional[str]:
+    """Marks a queued job running; returns its kind, or None if someone else has it."""
+    with SessionLocal() as db:
+        claimed = db.execute(
+            update(Job).filter(Job.id == job_id, Job.status == "queued").values(status="running", started_at=func.now())
+        ).rowcount
+        db.commit()
+        return db.scalar(select(Job.kind).filter(Job.id == job_id)) if claimed else None
+
+
+def execute_job(job_id: int) -> str:
+    """
+    Runs a claimed job's handler on a private event loop and stores its
+    result or error. Blocking: called in a worker thread or process.
+    """
+    with SessionLocal() as session:
+        job = session.get(Job, job_id)
+        kind = job.kind
+        output_path = temporary_path()
+        try:
+            params = JOB_KINDS[kind].params.model_validate_json(job.params)
+            with open(output_path, "wb") as output:
+                media_type, filename = asyncio.run(
+                    JOB_KINDS[kind].handler(SyncSessionAdapter(session), job, params, output)
+                )
+            os.replace(output_path, result_path(job_id))
+        except Exception as e:
+            session.rollback()
+            output_path.unlink(missing_ok=True)
+            logger.exception("job %d (%s) failed", job_id, kind)
+            values = {"status": "failed", "error": f"{e.__class__.__name__}: {e}"}
+        else:
+            values = {"status": "succeeded", "result_media_type": media_type, "result_filename": filename}
+        finally:
+            payload_path(job_id).unlink(missing_ok=True)
+        session.execute(update(Job).filter(Job.id == job_id).values(**values, finished_at=func.now()))
+        session.commit()
+    return values["status"]
+
+
+class JobWorkerPool:
+    """asyncio workers consuming job ids from a broker."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._tasks: list[asyncio.Task] = []
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    async def start(self) -> None:
+        """Starts the workers (once) and publishes the jobs left queued."""
+        if self._tasks:
+            return
+        self._threads = ThreadPoolExecutor(settings.JOB_WORKERS, thread_name_prefix="job")
+        if settings.JOB_PROCESS_WORKERS > 0:
+            self._processes = ProcessPoolExecutor(settings.JOB_PROCESS_WORKERS, initializer=_init_worker_process)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(settings.JOB_WORKERS)]
+        for job_id in await asyncio.get_running_loop().run_in_executor(self._threads, queued_job_ids):
+            await self.broker.publish(job_id)
+
+    async def stop(self) -> None:
+        """Stops consuming and waits for the running jobs to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        loop = asyncio.get_running_loop()
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                await loop.run_in_executor(None, partial(executor.shutdown, wait=True))
+        self._threads = self._processes = None
+
+    def _executor(self, kind: str) -> Executor:
+        if JOB_KINDS[kind].cpu_bound and self._processes is not None:
+            return self._processes
+        return self._threads
+
+    async def run(self, job_id: int) -> None:
+        loop = asyncio.get_running_loop()
+        kind = await loop.run_in_executor(self._threads, claim_job, job_id)
+        if kind is None:
+            return
+        status = await loop.run_in_executor(self._executor(kind), execute_job, job_id)
+        logger.info("job %d (%s) %s", job_id, kind, status)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self.broker.consume()
+            try:
+                await self.run(job_id)
+            except Exception:
+                logger.exception("job %d could not be run", job_id)
+
+
+broker = InProcessBroker()
+job_workers = JobWorkerPool(broker)
+
+
+async def submit_job(db, user_id: int, kind: str, params, payload: Optional[Path] = None) -> Job:
+    """
+    Stores a queued job and hands it to the workers (started on first use).
+    `payload` is an uploaded file (jobs.storage.receive_upload), moved to the job.
+    """
+    if not isinstance(params, JOB_KINDS[kind].params):
+        raise TypeError(f"{kind} jobs take {JOB_KINDS[kind].params.__name__}, not {type(params).__name__}")
+    job = Job(user_id=user_id, kind=kind, status="queued", params=params.model_dump_json())
+    db.add(job)
+    try:
+        await db.commit()
+        await db.refresh(job)
+    except BaseException:
+        if payload is not None:
+            payload.unlink(missing_ok=True)
+        raise
+    if payload is not None:
+        os.replace(payload, payload_path(job.id))
+    await job_workers.start()
+    await broker.publish(job.id)
+    return job
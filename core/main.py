@@ -1,7 +1,30 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from costs.routes import router as costs_routes
 from users.routes import router as users_routs
+from core.routes import router as system_routes, metrics_router
+from reports.routes import router as report_routes
+from jobs.routes import router as job_routes
+from jobs.worker import job_workers
+from auth.revocation import load_revoked_tokens
+from core.database import open_session
+from core.metrics import MetricsMiddleware
+from core.ratelimit import LoadSheddingMiddleware, rate_limit
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with open_session() as db:
+        await load_revoked_tokens(db)
+    # picks up jobs left queued; workers also start on the first submitted job
+    await job_workers.start()
+    yield
+    await job_workers.stop()
+
+
 app = FastAPI(
+    lifespan=lifespan,
+    dependencies=[Depends(rate_limit)],
     title="Cost Management API",             
     description="An API for managing and tracking costs in your application.",  
     version="0.0.1",                        
@@ -17,6 +40,14 @@ app = FastAPI(
 )
 
 
+# added first so MetricsMiddleware (outermost) also records the shed requests
+app.add_middleware(LoadSheddingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # add routes
 app.include_router(costs_routes,prefix="/api/V1")
-app.include_router(users_routs,prefix="/api/V1")
\ No newline at end of file
+app.include_router(users_routs,prefix="/api/V1")
+app.include_router(system_routes,prefix="/api/V1")
+app.include_router(report_routes,prefix="/api/V1")
+app.include_router(job_routes,prefix="/api/V1")
+app.include_router(metrics_router)
\ No newline at end of file
@@ -9,6 +9,8 @@ from dotenv import load_dotenv
 
 from users.models import *
 from costs.models import *
+from jobs.models import *
+from auth.models import *
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -47,6 +49,15 @@ else:
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Leaves the FTS5 search index (the `costs_fts` virtual table and its
+    shadow tables, created with raw SQL) out of autogenerate, which would
+    otherwise see them as removed and emit drop_table for them.
+    """
+    return not (type_ == "table" and name.startswith("costs_fts"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -69,6 +80,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         # render_as_batch=True
@@ -93,7 +105,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
             # render_as_batch=True
         )
 
@@ -0,0 +1,28 @@
+"""add costs (user_id, id) index
+
+Revision ID: 3b9d1c7e2a41
+Revises: ef5a4444d28a
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d1c7e2a41'
+down_revision: Union[str, Sequence[str], None] = 'ef5a4444d28a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_costs_user_id_id', 'costs', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_costs_user_id_id', table_name='costs')
@@ -0,0 +1,51 @@
+"""add cost timestamps and costs_archive
+
+Revision ID: 6f3b8d2c1e57
+Revises: a41c6e0f93b7
+Create Date: 2026-10-18 17:25:51.240963
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3b8d2c1e57'
+down_revision: Union[str, Sequence[str], None] = 'a41c6e0f93b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # batch mode: SQLite can't ADD COLUMN with a CURRENT_TIMESTAMP default;
+    # existing costs get the migration time as incurred_at / created_at
+    with op.batch_alter_table('costs') as batch_op:
+        batch_op.add_column(sa.Column('incurred_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False))
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False))
+    op.create_index('ix_costs_user_id_incurred_at', 'costs', ['user_id', 'incurred_at'], unique=False)
+
+    op.create_table('costs_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('incurred_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_costs_archive_user_id_incurred_at', 'costs_archive', ['user_id', 'incurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_costs_archive_user_id_incurred_at', table_name='costs_archive')
+    op.drop_table('costs_archive')
+    op.drop_index('ix_costs_user_id_incurred_at', table_name='costs')
+    with op.batch_alter_table('costs') as batch_op:
+        batch_op.drop_column('created_at')
+        batch_op.drop_column('incurred_at')
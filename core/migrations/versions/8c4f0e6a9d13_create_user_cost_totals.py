@@ -0,0 +1,43 @@
+"""create user_cost_totals rollup
+
+Revision ID: 8c4f0e6a9d13
+Revises: 3b9d1c7e2a41
+Create Date: 2026-10-18 11:40:07.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f0e6a9d13'
+down_revision: Union[str, Sequence[str], None] = '3b9d1c7e2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_cost_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cost_count', sa.Integer(), nullable=False),
+    sa.Column('amount_total', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_costs_user_id_amount', 'costs', ['user_id', 'amount'], unique=False)
+
+    # backfill the rollup from existing costs
+    op.execute(
+        "INSERT INTO user_cost_totals (user_id, cost_count, amount_total) "
+        "SELECT user_id, COUNT(*), SUM(amount) FROM costs "
+        "WHERE user_id IS NOT NULL GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_costs_user_id_amount', table_name='costs')
+    op.drop_table('user_cost_totals')
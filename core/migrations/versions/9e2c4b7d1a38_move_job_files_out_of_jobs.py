@@ -0,0 +1,33 @@
+"""move job files out of jobs
+
+Revision ID: 9e2c4b7d1a38
+Revises: f4b1e8d3a925
+Create Date: 2026-10-19 10:02:51.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2c4b7d1a38'
+down_revision: Union[str, Sequence[str], None] = 'f4b1e8d3a925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # uploads and results now live in JOB_STORAGE_DIR (jobs/storage.py)
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('result')
+        batch_op.drop_column('payload')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('payload', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('result', sa.LargeBinary(), nullable=True))
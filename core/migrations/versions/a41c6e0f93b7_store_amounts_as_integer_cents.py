@@ -0,0 +1,64 @@
+"""store amounts as integer cents
+
+Revision ID: a41c6e0f93b7
+Revises: d27a5b8e4c90
+Create Date: 2026-10-18 16:10:32.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c6e0f93b7'
+down_revision: Union[str, Sequence[str], None] = 'd27a5b8e4c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, amount column)
+MONEY_COLUMNS = [('costs', 'amount'), ('user_cost_totals', 'amount_total')]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # scale to cents while still a float column, then change the types (the cast is
+    # exact for costs; the rollup's values are recomputed below)
+    op.execute("UPDATE costs SET amount = ROUND(amount * 100)")
+    for table, column in MONEY_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Float(),
+                type_=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::bigint",
+            )
+    # the rollup is recomputed from the rounded costs: rounding the float total
+    # on its own can disagree with the sum of the rounded amounts
+    op.execute(
+        "UPDATE user_cost_totals SET "
+        "cost_count = (SELECT COUNT(*) FROM costs WHERE costs.user_id = user_cost_totals.user_id), "
+        "amount_total = (SELECT COALESCE(SUM(amount), 0) FROM costs WHERE costs.user_id = user_cost_totals.user_id)"
+    )
+    op.execute(
+        "INSERT INTO user_cost_totals (user_id, cost_count, amount_total, version) "
+        "SELECT user_id, COUNT(*), SUM(amount), 1 FROM costs "
+        "WHERE user_id IS NOT NULL AND user_id NOT IN (SELECT user_id FROM user_cost_totals) "
+        "GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.BigInteger(),
+                type_=sa.Float(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::double precision",
+            )
+        op.execute(f"UPDATE {table} SET {column} = {column} / 100.0")
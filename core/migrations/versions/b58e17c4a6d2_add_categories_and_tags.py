@@ -0,0 +1,65 @@
+"""add categories and tags
+
+Revision ID: b58e17c4a6d2
+Revises: 6f3b8d2c1e57
+Create Date: 2026-10-18 18:42:13.507126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e17c4a6d2'
+down_revision: Union[str, Sequence[str], None] = '6f3b8d2c1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'name', name='uq_categories_user_id_name')
+    )
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'name', name='uq_tags_user_id_name')
+    )
+    op.create_table('cost_tags',
+    sa.Column('cost_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cost_id'], ['costs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cost_id', 'tag_id')
+    )
+    op.create_index('ix_cost_tags_tag_id_cost_id', 'cost_tags', ['tag_id', 'cost_id'], unique=False)
+
+    for table in ('costs', 'costs_archive'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(f'fk_{table}_category_id_categories', 'categories', ['category_id'], ['id'])
+    op.create_index('ix_costs_user_id_category_id', 'costs', ['user_id', 'category_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_costs_user_id_category_id', table_name='costs')
+    for table in ('costs', 'costs_archive'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_category_id_categories', type_='foreignkey')
+            batch_op.drop_column('category_id')
+    op.drop_index('ix_cost_tags_tag_id_cost_id', table_name='cost_tags')
+    op.drop_table('cost_tags')
+    op.drop_table('tags')
+    op.drop_table('categories')
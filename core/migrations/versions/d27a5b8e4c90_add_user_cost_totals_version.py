@@ -0,0 +1,29 @@
+"""add user_cost_totals.version
+
+Revision ID: d27a5b8e4c90
+Revises: 8c4f0e6a9d13
+Create Date: 2026-10-18 15:02:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27a5b8e4c90'
+down_revision: Union[str, Sequence[str], None] = '8c4f0e6a9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_cost_totals', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user_cost_totals') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,64 @@
+"""add cost description search
+
+Revision ID: e3a9c5f17b28
+Revises: b58e17c4a6d2
+Create Date: 2026-10-18 19:27:45.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c5f17b28'
+down_revision: Union[str, Sequence[str], None] = 'b58e17c4a6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite: external-content FTS5 table kept in sync by triggers (note that a
+# later batch_alter_table on costs recreates the table and drops the triggers)
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE costs_fts USING fts5(description, content='costs', content_rowid='id')",
+    "CREATE TRIGGER costs_fts_insert AFTER INSERT ON costs BEGIN "
+    "INSERT INTO costs_fts(rowid, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER costs_fts_delete AFTER DELETE ON costs BEGIN "
+    "INSERT INTO costs_fts(costs_fts, rowid, description) VALUES ('delete', old.id, old.description); END",
+    "CREATE TRIGGER costs_fts_update AFTER UPDATE OF description ON costs BEGIN "
+    "INSERT INTO costs_fts(costs_fts, rowid, description) VALUES ('delete', old.id, old.description); "
+    "INSERT INTO costs_fts(rowid, description) VALUES (new.id, new.description); END",
+    # index the existing rows
+    "INSERT INTO costs_fts(costs_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER costs_fts_update",
+    "DROP TRIGGER costs_fts_delete",
+    "DROP TRIGGER costs_fts_insert",
+    "DROP TABLE costs_fts",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        # the index maintains itself, no triggers or extra column needed
+        op.create_index(
+            'ix_costs_description_fts', 'costs',
+            [sa.text("to_tsvector('simple', description)")],
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.drop_index('ix_costs_description_fts', table_name='costs')
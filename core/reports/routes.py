@@ -0,0 +1,28 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query
+from auth.jwt_auth import get_admin_user
+from reports import schemas
+from users.schemas import UserPrincipalSchema
+
+router = APIRouter(tags=["admin"], prefix="/admin/reports")
+
+
+@router.get("/spend", response_model=schemas.SpendReport)
+async def spend_report(
+    params: Annotated[schemas.SpendReportParams, Query()],
+    admin: UserPrincipalSchema = Depends(get_admin_user)
+):
+    """
+    Org-wide spend of the costs incurred in the window (half-open, UTC),
+    for the users listed in `ADMIN_USERNAMES`:
+    - `overall`: count, total, mean, min, p50 / p90 / p99 and max,
+    - `top_users`: the same per user, largest total first, with their
+      number of outlier costs,
+    - `outliers`: the largest costs above their owner's p75 + factor * IQR.
+    - The report is computed once per window and served from a cache for
+      `ADMIN_REPORT_CACHE_SECONDS` (`cached: true`); `timings` tells how
+      long the fetch and the aggregation took.
+    """
+    from reports.spend import get_spend_report  # NumPy is imported on first use, not at startup
+
+    return await get_spend_report(params)
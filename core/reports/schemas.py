@@ -0,0 +1,59 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Annotated, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from costs.schemas import UtcDatetime
+
+
+class SpendReportParams(BaseModel):
+    """Query parameters of the org-wide spend report (the report window and its options)."""
+    model_config = ConfigDict(frozen=True)
+
+    incurred_from: Annotated[Optional[UtcDatetime], Field(description="Only costs incurred at or after this time")] = None
+    incurred_to: Annotated[Optional[UtcDatetime], Field(description="Only costs incurred before this time")] = None
+    include_archived: Annotated[bool, Field(description="Also read the archived costs (costs_archive)")] = False
+    outlier_factor: Annotated[float, Field(gt=0, le=100, description="Outlier: amount above the user's p75 + factor * IQR")] = 1.5
+    top_users: Annotated[int, Field(ge=1, le=1000, description="Users listed, largest total first")] = 100
+    top_outliers: Annotated[int, Field(ge=0, le=1000, description="Outlier costs listed, largest first")] = 20
+
+
+class SpendStats(BaseModel):
+    """Count, total and amount distribution of a set of costs (percentiles interpolated, rounded to cents)."""
+    count: int
+    total: Decimal
+    mean: Optional[Decimal]
+    min: Optional[Decimal]
+    p50: Optional[Decimal]
+    p90: Optional[Decimal]
+    p99: Optional[Decimal]
+    max: Optional[Decimal]
+
+
+class UserSpend(SpendStats):
+    user_id: int
+    username: Optional[str]
+    outliers: int
+
+
+class OutlierCost(BaseModel):
+    id: int
+    user_id: int
+    amount: Decimal
+    fence: Decimal  # the user's outlier threshold
+
+
+class ReportTimings(BaseModel):
+    rows: int
+    fetch_seconds: float  # database -> NumPy arrays
+    compute_seconds: float  # grouped stats
+
+
+class SpendReport(BaseModel):
+    params: SpendReportParams
+    generated_at: datetime
+    cached: bool
+    timings: ReportTimings
+    users: int  # users with at least one cost in the window
+    overall: SpendStats
+    top_users: list[UserSpend]
+    outliers: list[OutlierCost]
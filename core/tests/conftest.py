@@ -0,0 +1,62 @@
+"""
+Test setup: the real app on a throwaway SQLite file, driven in-process.
+
+Settings are read at import time, so the environment is set here, before
+anything from the application is imported.
+"""
+import os
+import tempfile
+
+_directory = tempfile.mkdtemp(prefix="cost-tests-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_directory, 'test.db')}"
+os.environ["JOB_STORAGE_DIR"] = os.path.join(_directory, "jobs")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["ADMIN_USERNAMES"] = '["admin"]'
+
+import itertools  # noqa: E402
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+_usernames = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    from benchmarks.common import create_tables
+
+    create_tables()
+
+
+@pytest.fixture
+async def client():
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/V1") as client:
+        yield client
+
+
+async def login(client, username: str = None) -> dict:
+    """Registers and logs in a new user (or `username`); returns the Authorization header."""
+    username = username or f"user{next(_usernames)}"
+    await client.post("/users/register", json={"username": username, "password": "pw", "password_confirm": "pw"})
+    response = await client.post("/users/login", json={"username": username, "password": "pw"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.cookies['access_token']}"}
+
+
+@pytest.fixture
+async def headers(client):
+    return await login(client)
+
+
+def rollup_drift() -> list[str]:
+    from core.database import SessionLocal
+    from costs.commands import rollup_drift
+
+    with SessionLocal() as db:
+        return rollup_drift(db)
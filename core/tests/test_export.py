@@ -0,0 +1,43 @@
+"""Exports keep categories and tags, and import back as-is."""
+import json
+import pytest
+from conftest import login
+
+pytestmark = pytest.mark.anyio
+
+COSTS = [
+    {"description": "Lunch", "amount": "12.50", "category": "Food", "tags": ["work", "team"]},
+    {"description": "Train", "amount": "30.00", "category": "Travel", "tags": []},
+    {"description": "Misc thing", "amount": "1.00"},
+]
+
+
+def labels(costs: list[dict]) -> list[tuple]:
+    return sorted((cost["description"], cost["amount"], cost["category"], sorted(cost["tags"])) for cost in costs)
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+async def test_export_import_round_trip(client, format):
+    source = await login(client)
+    for cost in COSTS:
+        (await client.post("/costs/", json=cost, headers=source)).raise_for_status()
+    exported = await client.get("/costs/export", params={"format": format}, headers=source)
+    assert exported.status_code == 200
+    if format == "csv":
+        assert exported.text.splitlines()[0] == "id,description,amount,incurred_at,category,tags"
+
+    target = await login(client)
+    response = await client.post("/costs/import", params={"format": format}, content=exported.content, headers=target)
+    assert response.json() == {"imported": 3, "failed": 0, "errors": []}
+
+    originals = (await client.get("/costs/", headers=source)).json()
+    imported = (await client.get("/costs/", headers=target)).json()
+    assert labels(imported) == labels(originals)
+    assert ("Lunch", "12.50", "Food", ["team", "work"]) in labels(imported)
+
+
+async def test_stream_listing_has_labels(client, headers):
+    await client.post("/costs/", json=COSTS[0], headers=headers)
+    response = await client.get("/costs/", params={"stream": "true"}, headers=headers)
+    (row,) = [json.loads(line) for line in response.text.splitlines()]
+    assert (row["category"], row["tags"]) == ("Food", ["team", "work"])
@@ -0,0 +1,29 @@
+"""Limits of POST /costs/import, which parses the body as it arrives."""
+import pytest
+from costs.transfer import MAX_LINE_LENGTH
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_line_without_newline_is_rejected_early(client, headers):
+    sent = 0
+
+    async def upload():
+        nonlocal sent
+        yield b"description,amount\nCoffee,2.50\n"
+        for _ in range(1000):
+            sent += 1
+            yield b"x" * 1024
+
+    response = await client.post("/costs/import", params={"format": "csv"}, content=upload(), headers=headers)
+    assert response.status_code == 413
+    assert response.json()["detail"] == f"Line 3 is longer than {MAX_LINE_LENGTH} characters"
+    # reading stopped at the limit, not at the end of the body
+    assert sent <= MAX_LINE_LENGTH // 1024 + 1
+
+
+async def test_long_line_within_a_chunk_is_rejected(client, headers):
+    body = b'{"description": "ok", "amount": 1}\n' + b"x" * (MAX_LINE_LENGTH + 1) + b"\n"
+    response = await client.post("/costs/import", params={"format": "ndjson"}, content=body, headers=headers)
+    assert response.status_code == 413
+    assert response.json()["detail"] == f"Line 2 is longer than {MAX_LINE_LENGTH} characters"
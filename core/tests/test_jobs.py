@@ -0,0 +1,93 @@
+"""Background import / export jobs: uploads and results go through files, not memory."""
+import asyncio
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+ROWS = 5000
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def workers():
+    """One event loop for the module: the workers (started on first submit) outlive a test."""
+    from jobs.worker import job_workers
+
+    yield
+    await job_workers.stop()
+
+
+async def finished(client, headers, job_id: int) -> dict:
+    for _ in range(200):
+        job = (await client.get(f"/jobs/{job_id}", headers=headers)).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+async def test_import_then_export(client, headers):
+    from jobs.storage import payload_path, result_path
+
+    async def upload():
+        # many small chunks, lines split across them
+        yield b"description,amount\n"
+        body = "".join(f"Imported {i},{i % 100}.25\n" for i in range(ROWS)).encode()
+        for start in range(0, len(body), 1000):
+            yield body[start:start + 1000]
+
+    response = await client.post("/jobs/import", params={"format": "csv"}, content=upload(), headers=headers)
+    assert response.status_code == 202
+    job = await finished(client, headers, response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert (await client.get(f"/jobs/{job['id']}/result", headers=headers)).json()["imported"] == ROWS
+    assert not payload_path(job["id"]).exists()
+
+    response = await client.post("/jobs/export", params={"format": "csv"}, headers=headers)
+    job = await finished(client, headers, response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert result_path(job["id"]).exists()
+
+    response = await client.get(f"/jobs/{job['id']}/result", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="costs.csv"'
+    lines = response.text.splitlines()
+    assert lines[0] == "id,description,amount,incurred_at,category,tags"
+    assert len(lines) == ROWS + 1
+
+
+async def test_failed_job_keeps_no_result(client, headers):
+    from jobs.storage import result_path
+
+    response = await client.post("/jobs/import", params={"format": "csv"}, content=b"foo,bar\n1,2\n", headers=headers)
+    job = await finished(client, headers, response.json()["id"])
+    assert job["status"] == "failed"
+    assert not result_path(job["id"]).exists()
+    assert (await client.get(f"/jobs/{job['id']}/result", headers=headers)).status_code == 409
+
+
+async def test_oversized_upload_is_rejected_and_removed(client, headers, monkeypatch):
+    from core.config import settings
+    from jobs.storage import storage_dir
+
+    monkeypatch.setattr(settings, "JOB_UPLOAD_MAX_BYTES", 100_000)
+    files_before = set(storage_dir().iterdir())
+    sent = 0
+
+    async def upload():
+        nonlocal sent
+        for _ in range(1000):
+            sent += 1
+            yield b"description,amount\n" * 1000
+
+    response = await client.post("/jobs/import", params={"format": "csv"}, content=upload(), headers=headers)
+    assert response.status_code == 413
+    assert sent < 10
+    assert set(storage_dir().iterdir()) == files_before
+
+
+async def test_location_is_the_status_url(client, headers):
+    response = await client.post("/jobs/export", params={"format": "ndjson"}, headers=headers)
+    assert response.status_code == 202
+    assert response.headers["location"] == f"http://test/api/V1/jobs/{response.json()['id']}"
+    assert (await client.get(response.headers["location"], headers=headers)).status_code == 200
+    await finished(client, headers, response.json()["id"])
@@ -0,0 +1,32 @@
+"""Monitoring endpoints: /metrics and /system."""
+import pytest
+from conftest import login
+
+pytestmark = pytest.mark.anyio
+
+
+def series(text: str, name: str) -> dict[str, float]:
+    return {
+        line.split(" ")[0]: float(line.split(" ")[1])
+        for line in text.splitlines() if line.startswith(name + "{")
+    }
+
+
+async def test_user_cache_hits_and_misses(client, headers):
+    before = series((await client.get("http://test/metrics")).text, "user_cache_lookups_total")
+    for _ in range(3):
+        (await client.get("/costs/", headers=headers)).raise_for_status()
+    after = series((await client.get("http://test/metrics")).text, "user_cache_lookups_total")
+
+    hit = 'user_cache_lookups_total{result="hit"}'
+    miss = 'user_cache_lookups_total{result="miss"}'
+    lookups = after.get(hit, 0) + after.get(miss, 0) - before.get(hit, 0) - before.get(miss, 0)
+    assert lookups == 3
+    assert after.get(hit, 0) - before.get(hit, 0) >= 2
+
+
+async def test_db_pool_status_is_admin_only(client, headers):
+    assert (await client.get("/system/db-pool")).status_code == 401
+    assert (await client.get("/system/db-pool", headers=headers)).status_code == 403
+    response = await client.get("/system/db-pool", headers=await login(client, "admin"))
+    assert response.status_code == 200
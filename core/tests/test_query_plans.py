@@ -0,0 +1,7 @@
+"""Router queries must be served by indexes (see `python -m costs.commands check-query-plans`)."""
+from costs.commands import query_plan_scans
+
+
+def test_no_router_query_scans_a_whole_table():
+    failures = {name: scans for name, scans in query_plan_scans().items() if scans}
+    assert failures == {}
@@ -0,0 +1,42 @@
+"""Who shares a rate-limit bucket."""
+import ipaddress
+import pytest
+from starlette.requests import Request
+from core import ratelimit
+from core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+def request_from(peer: str, forwarded: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": (peer, 1234)})
+
+
+async def test_login_is_limited_per_username_and_ip(client, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    burst = settings.RATE_LIMITS["POST /api/V1/users/login"].burst
+
+    async def attempt(username):
+        response = await client.post("/users/login", json={"username": username, "password": "wrong"})
+        return response.status_code
+
+    assert [await attempt("Mallory") for _ in range(burst)] == [400] * burst
+    assert await attempt("mallory") == 429
+    # another user behind the same address keeps their own bucket
+    assert await attempt("alice-behind-nat") == 400
+
+
+def test_client_ip_without_trusted_proxies_ignores_forwarded_for():
+    assert ratelimit.client_ip(request_from("10.0.0.5", "6.6.6.6")) == "10.0.0.5"
+
+
+def test_client_ip_behind_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+    # the client forged the first entry; the proxy appended the real address
+    assert ratelimit.client_ip(request_from("10.0.0.5", "6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    # chained proxies are skipped
+    assert ratelimit.client_ip(request_from("10.0.0.5", "203.0.113.7, 10.1.2.3")) == "203.0.113.7"
+    assert ratelimit.client_ip(request_from("10.0.0.5")) == "10.0.0.5"
+    # an untrusted peer can't choose its address
+    assert ratelimit.client_ip(request_from("198.51.100.1", "203.0.113.7")) == "198.51.100.1"
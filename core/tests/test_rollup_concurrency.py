@@ -0,0 +1,56 @@
+"""Concurrent writes to the same costs must keep user_cost_totals in line with the costs table."""
+import asyncio
+import pytest
+from conftest import rollup_drift
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_costs(client, headers, amounts) -> list[int]:
+    ids = []
+    for i, amount in enumerate(amounts):
+        response = await client.post("/costs/", json={"description": f"Cost {i}", "amount": amount}, headers=headers)
+        ids.append(response.json()["id"])
+    return ids
+
+
+async def test_concurrent_deletes(client, headers):
+    ids = await create_costs(client, headers, [1 + i * 2.5 for i in range(10)])
+    responses = await asyncio.gather(*(client.delete(f"/costs/{id}/", headers=headers) for id in ids for _ in range(3)))
+
+    codes = [response.status_code for response in responses]
+    assert codes.count(200) == 10
+    assert codes.count(404) == 20
+    assert rollup_drift() == []
+
+
+async def test_concurrent_bulk_deletes(client, headers):
+    ids = await create_costs(client, headers, [3.25] * 10)
+    responses = await asyncio.gather(*(client.request("DELETE", "/costs/bulk", json=ids, headers=headers) for _ in range(3)))
+
+    statuses = [item["status"] for response in responses for item in response.json()]
+    assert statuses.count("deleted") == 10
+    assert statuses.count("not_found") == 20
+    assert rollup_drift() == []
+
+
+async def test_concurrent_updates(client, headers):
+    ids = await create_costs(client, headers, [5] * 5)
+    responses = await asyncio.gather(*(
+        client.put(f"/costs/{id}/", json={"description": "Updated", "amount": amount}, headers=headers)
+        for id in ids for amount in (1, 7.5, 100)
+    ))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert rollup_drift() == []
+
+
+async def test_concurrent_bulk_updates(client, headers):
+    ids = await create_costs(client, headers, [5] * 5)
+    responses = await asyncio.gather(*(
+        client.patch("/costs/bulk", json=[{"id": id, "description": "Updated", "amount": amount} for id in ids], headers=headers)
+        for amount in (1, 7.5, 100)
+    ))
+
+    assert all(item["status"] == "updated" for response in responses for item in response.json())
+    assert rollup_drift() == []
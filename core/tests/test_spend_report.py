@@ -0,0 +1,28 @@
+"""Admin spend report."""
+import pytest
+from conftest import login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_orphan_costs_are_left_out(client):
+    from core.database import SessionLocal
+    from costs.models import Cost
+    from reports.spend import report_cache
+
+    headers = await login(client, "admin")
+    for amount in (10, 20, 30):
+        await client.post("/costs/", json={"description": "Owned", "amount": amount}, headers=headers)
+    with SessionLocal() as db:
+        db.add(Cost(description="Orphan", amount=1000, user_id=None))
+        db.commit()
+    report_cache.clear()
+
+    response = await client.get("/admin/reports/spend", headers=headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert all(user["user_id"] is not None for user in report["top_users"])
+    admin = next(user for user in report["top_users"] if user["username"] == "admin")
+    assert (admin["count"], admin["total"]) == (3, "60.00")
+    assert all(outlier["amount"] != "1000.00" for outlier in report["outliers"])
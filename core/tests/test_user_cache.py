@@ -0,0 +1,88 @@
+"""The Redis user cache backend, against an in-memory fake of the redis-py subset it uses."""
+import asyncio
+import pytest
+from conftest import login
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRedis:
+    """`get` / `set(ex=)` / `delete` of redis.asyncio.Redis, with a clock the test moves."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.data: dict[str, tuple[bytes, float]] = {}
+
+    async def get(self, key):
+        value, expires_at = self.data.get(key, (None, 0))
+        if value is not None and self.now >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex):
+        self.data[key] = (value.encode() if isinstance(value, str) else value, self.now + ex)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    from auth.user_cache import RedisUserCacheBackend, user_cache
+
+    fake = FakeRedis()
+    monkeypatch.setattr(user_cache, "backend", RedisUserCacheBackend(fake, ttl_seconds=60))
+    return fake
+
+
+async def test_get_set_and_ttl(redis_cache):
+    from auth.user_cache import user_cache
+    from users.schemas import UserPrincipalSchema
+
+    user = UserPrincipalSchema(id=42, username="cached", is_active=True)
+    assert await user_cache.get(42) is None
+    await user_cache.set(user)
+    assert "costs:user:42" in redis_cache.data
+    assert await user_cache.get(42) == user
+
+    redis_cache.now += 61
+    assert await user_cache.get(42) is None
+
+
+async def test_password_change_invalidates(client, redis_cache):
+    from auth.user_cache import user_cache
+    from core.database import SessionLocal
+    from users.models import UserModel
+
+    headers = await login(client, "changes-password")
+    (await client.get("/costs/", headers=headers)).raise_for_status()
+    with SessionLocal() as db:
+        user = db.query(UserModel).filter_by(username="changes-password").one()
+    key = f"costs:user:{user.id}"
+    assert key in redis_cache.data
+
+    with SessionLocal() as db:
+        db.get(UserModel, user.id).set_password("new password")
+        db.commit()
+    # invalidate_soon scheduled the delete on the running loop
+    await asyncio.gather(*user_cache._pending)
+    assert key not in redis_cache.data
+
+
+async def test_deactivated_user_is_rejected(client, redis_cache):
+    from auth.user_cache import user_cache
+    from core.database import SessionLocal
+    from users.models import UserModel
+
+    headers = await login(client, "gets-deactivated")
+    assert (await client.get("/costs/", headers=headers)).status_code == 200  # now cached
+
+    with SessionLocal() as db:
+        db.query(UserModel).filter_by(username="gets-deactivated").one().is_active = False
+        db.commit()
+    await asyncio.gather(*user_cache._pending)
+
+    response = await client.get("/costs/", headers=headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "User is inactive"
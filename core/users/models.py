@@ -1,10 +1,8 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from sqlalchemy.sql import func
-from passlib.context import CryptContext
 from core.database import Base
 from sqlalchemy.orm import relationship
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from users.passwords import get_pwd_context
 
 class UserModel(Base):
     __tablename__ = "users"
@@ -15,17 +13,24 @@ class UserModel(Base):
     is_active = Column(Boolean, default=True)
     created_date = Column(DateTime, server_default=func.now())
     updated_date = Column(DateTime, server_default=func.now(), server_onupdate=func.now())
-    costs= relationship("Cost", back_populates="user")
+    costs= relationship("Cost", back_populates="user", lazy="raise_on_sql")
     
     
     def hash_password(self, plain_password: str) -> str:
-        """Hashes the given password using bcrypt."""
-        return pwd_context.hash(plain_password)
+        """Hashes the given password using bcrypt (blocking; routes use users.passwords)."""
+        return get_pwd_context().hash(plain_password)
     
     
     def verify_password(self, plain_password: str) -> bool:
         """Verifies the given password against the stored hash."""
-        return pwd_context.verify(plain_password, self.password)
+        return get_pwd_context().verify(plain_password, self.password)
     
     def set_password(self, plain_text: str) -> None:
-        self.password = self.hash_password(plain_text)
\ No newline at end of file
+        self.password = self.hash_password(plain_text)
+
+
+def __getattr__(name: str):
+    # lazy `from users.models import pwd_context`, see users.passwords
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
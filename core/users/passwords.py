@@ -0,0 +1,99 @@
+"""
+bcrypt hashing and verification off the event loop.
+
+bcrypt takes ~100-300 ms of CPU per call, which would freeze every request
+on the worker if run inside an `async def` handler. Calls are run in a
+thread or process pool (`PASSWORD_HASH_EXECUTOR`) behind a semaphore, so a
+login burst queues here (or is shed with 503) instead of stalling cost
+requests.
+
+passlib is imported and the `CryptContext` built on first use (in each pool
+process), not at import: workers that never see a login don't pay for them.
+`pwd_context` is still importable from here (and from users.models); it is
+resolved through `get_pwd_context()` when first read.
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+from fastapi import HTTPException
+from core.config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+_executor: Optional[Executor] = None
+_admission: Optional[asyncio.Semaphore] = None
+
+
+@functools.cache
+def get_pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def __getattr__(name: str):
+    # `pwd_context` used to be built at import; it is kept as a lazy alias
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# module-level so they can be pickled for the process pool
+def _hash(plain_password: str) -> str:
+    return get_pwd_context().hash(plain_password)
+
+
+def _verify_and_update(plain_password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return get_pwd_context().verify_and_update(plain_password, hashed)
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if _executor is None and settings.PASSWORD_HASH_EXECUTOR != "inline":
+        pool = ProcessPoolExecutor if settings.PASSWORD_HASH_EXECUTOR == "process" else ThreadPoolExecutor
+        _executor = pool(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _executor
+
+
+async def _run(fn, *args):
+    """
+    Runs `fn` in the pool once admitted by the semaphore.
+    - Waits at most PASSWORD_HASH_ADMISSION_TIMEOUT seconds for a slot,
+      then rejects with 503 + Retry-After.
+    - PASSWORD_HASH_EXECUTOR=inline runs on the event loop (old behaviour).
+    """
+    global _admission
+    executor = _get_executor()
+    if executor is None:
+        return fn(*args)
+
+    if _admission is None:
+        _admission = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+    try:
+        await asyncio.wait_for(_admission.acquire(), settings.PASSWORD_HASH_ADMISSION_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent password checks, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _admission.release()
+
+
+async def hash_password(plain_password: str) -> str:
+    """Hashes the given password using bcrypt, in the worker pool."""
+    return await _run(_hash, plain_password)
+
+
+async def verify_password(plain_password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """
+    Verifies a password in the worker pool.
+    Returns (valid, new_hash); new_hash is set when `CryptContext.needs_update`
+    says the stored hash is outdated (e.g. fewer rounds) and should be replaced.
+    """
+    return await _run(_verify_and_update, plain_password, hashed)
@@ -1,49 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from users.schemas import UserRegisterSchema, UserLoginSchema
 from users.models import UserModel
+from users import passwords
 from core.database import get_db
 from auth.jwt_auth import generate_access_token, generate_refresh_token, decode_refresh_token
+from auth.revocation import ensure_revoked_tokens_loaded, revoke_token
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 # ------------------ REGISTER ------------------
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-async def user_register(request: UserRegisterSchema, db: Session = Depends(get_db)):
+async def user_register(request: UserRegisterSchema, db: AsyncSession = Depends(get_db)):
     """
     Register a new user.
     - Checks if username already exists.
-    - Hashes the password before saving.
+    - Hashes the password before saving (in the password worker pool).
     - Stores the user in the database.
     """
     
     
-    if db.query(UserModel).filter_by(username=request.username.lower()).first():
+    result = await db.execute(select(UserModel).filter_by(username=request.username.lower()))
+    if result.scalars().first():
         raise HTTPException(status_code=409, detail="Username already exists")
 
     user = UserModel(username=request.username.lower())
-    user.set_password(request.password)
+    user.password = await passwords.hash_password(request.password)
     db.add(user)
-    db.commit()
+    await db.commit()
     return {"detail": "User registered successfully"}
 
 
 # ------------------ LOGIN ------------------
 @router.post("/login")
-async def user_login(request: UserLoginSchema, response: Response, db: Session = Depends(get_db)):
+async def user_login(request: UserLoginSchema, response: Response, db: AsyncSession = Depends(get_db)):
     """
     User login and token generation.
-    - Verifies username and password.
+    - Verifies username and password (in the password worker pool).
+    - Transparently re-hashes outdated password hashes.
     - Generates an access token (short-lived) and refresh token (long-lived).
     - Stores tokens in secure HttpOnly cookies.
     """
     
     
-    user = db.query(UserModel).filter_by(username=request.username.lower()).first()
-    if not user or not user.verify_password(request.password):
+    result = await db.execute(select(UserModel).filter_by(username=request.username.lower()))
+    user = result.scalars().first()
+    if not user:
         raise HTTPException(status_code=400, detail="Invalid username or password")
+    valid, new_hash = await passwords.verify_password(request.password, user.password)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
 
     access_token = generate_access_token(user.id)
     refresh_token = generate_refresh_token(user.id)
@@ -73,11 +85,13 @@ async def user_login(request: UserLoginSchema, response: Response, db: Session =
 
 # ------------------ REFRESH TOKEN ------------------
 @router.post("/refresh-token")
-async def refresh_access_token(request: Request, response: Response):
+async def refresh_access_token(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """
     Refresh access token.
     - Reads refresh token from HttpOnly cookie.
-    - Validates it.
+    - Validates it (revoked tokens are rejected without a database query).
+    - Rotates it: revokes the used token and sets a new refresh token cookie,
+      so each refresh token works once.
     - Generates a new access token and updates the cookie.
     - No need for user to log in again.
     """
@@ -86,8 +100,15 @@ async def refresh_access_token(request: Request, response: Response):
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Refresh token not found")
 
-    user_id = decode_refresh_token(refresh_token)
+    await ensure_revoked_tokens_loaded(db)
+    claims = decode_refresh_token(refresh_token)
+    # another request (or process) may have used this token first
+    if not await revoke_token(db, claims["jti"], claims["exp"]):
+        raise HTTPException(status_code=401, detail="Token revoked")
+
+    user_id = claims["user_id"]
     new_access_token = generate_access_token(user_id)
+    new_refresh_token = generate_refresh_token(user_id)
 
     response.set_cookie(
         key="access_token",
@@ -97,18 +118,37 @@ async def refresh_access_token(request: Request, response: Response):
         samesite="strict",
         max_age=60 * 5,
     )
+    response.set_cookie(
+        key="refresh_token",
+        value=new_refresh_token,
+        httponly=True,
+        secure=False,
+        samesite="strict",
+        max_age=3600 * 24,
+    )
     return {"detail": "Access token refreshed"}
 
 
 # ------------------ LOGOUT ------------------
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """
     Logout user.
+    - Revokes the refresh token, if the cookie holds a valid one.
     - Deletes both access_token and refresh_token cookies.
     - Ends the user's session securely.
     """
     
+    refresh_token = request.cookies.get("refresh_token")
+    if refresh_token:
+        await ensure_revoked_tokens_loaded(db)
+        try:
+            claims = decode_refresh_token(refresh_token)
+        except HTTPException:
+            pass  # expired, invalid or already revoked: nothing to revoke
+        else:
+            await revoke_token(db, claims["jti"], claims["exp"])
+
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
     return {"detail": "Logged out successfully"}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel,Field,field_validator
+from pydantic import BaseModel,ConfigDict,Field,field_validator
 from typing import Optional
 from datetime import datetime
 
@@ -22,3 +22,12 @@ class UserLoginSchema(BaseModel):
 
 class UserRefreshTokenSchema(BaseModel):
     token: str = Field(..., description="refresh token of the user")
+
+
+class UserPrincipalSchema(BaseModel):
+    """Minimal authenticated user returned by get_authenticated_user (and cached)."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    username: str
+    is_active: Optional[bool] = True